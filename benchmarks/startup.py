@@ -0,0 +1,122 @@
+"""
+benchmarks.startup
+==================
+
+Cold-start benchmark for the consumer and worker entry points.
+
+Each entry point is imported in a fresh interpreter (as a new pod
+would) several times; the benchmark reports import wall time, peak
+RSS, number of loaded modules and the heaviest imports as measured
+by ``python -X importtime``.
+
+Usage::
+
+    python -m benchmarks.startup [--runs 5] [--top 5]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+ENTRY_POINTS: Dict[str, str] = {
+    "consumer": "import consumer.main",
+    "worker": "import workers.celery_app, workers.tasks",
+}
+
+_CHILD = """
+import json, resource, sys, time
+started = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - started
+print(json.dumps({{
+    "seconds": elapsed,
+    "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    "modules": len(sys.modules),
+}}))
+"""
+
+_PROJECT_PACKAGES = {"consumer", "core", "services", "workers"}
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _run(statement: str, importtime: bool = False) -> subprocess.CompletedProcess:
+    cmd = [sys.executable]
+    if importtime:
+        cmd += ["-X", "importtime"]
+    cmd += ["-c", _CHILD.format(statement=statement)]
+
+    env = dict(os.environ, PYTHONPATH=_ROOT, PYTHONDONTWRITEBYTECODE="1")
+
+    return subprocess.run(
+        cmd, cwd=_ROOT, env=env, capture_output=True, text=True, check=True
+    )
+
+
+def _heaviest_imports(stderr: str, top: int) -> List[Tuple[str, int]]:
+    """
+    Parse ``-X importtime`` output into (package, cumulative µs) for
+    third-party / stdlib top-level packages, at any nesting depth.
+    """
+    totals: Dict[str, int] = {}
+
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = (p.strip() for p in line[len("import time:"):].split("|"))
+        name = name.split(".")[0]
+        if not cumulative.isdigit() or name in _PROJECT_PACKAGES:
+            continue
+        totals[name] = max(totals.get(name, 0), int(cumulative))
+
+    return sorted(totals.items(), key=lambda kv: kv[1], reverse=True)[:top]
+
+
+def measure(statement: str, runs: int, top: int) -> Dict[str, object]:
+    """
+    Measure one entry point.
+
+    Parameters
+    ----------
+    statement : str
+        Import statement executed in a fresh interpreter.
+    runs : int
+        Number of cold starts.
+    top : int
+        Number of heaviest top-level imports to report.
+    """
+    samples = [json.loads(_run(statement).stdout) for _ in range(runs)]
+    seconds = [s["seconds"] for s in samples]
+
+    return {
+        "import_seconds_median": round(statistics.median(seconds), 4),
+        "import_seconds_max": round(max(seconds), 4),
+        "max_rss_mb": round(max(s["max_rss_kb"] for s in samples) / 1024, 1),
+        "modules": samples[-1]["modules"],
+        "heaviest_imports_ms": [
+            (name, round(us / 1000, 1))
+            for name, us in _heaviest_imports(_run(statement, importtime=True).stderr, top)
+        ],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=5)
+    args = parser.parse_args()
+
+    report = {
+        name: measure(statement, args.runs, args.top)
+        for name, statement in ENTRY_POINTS.items()
+    }
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
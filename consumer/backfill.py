@@ -0,0 +1,361 @@
+"""
+consumer.backfill
+=================
+
+Backfill entry point: reprocess SCORM ZIPs already in the repository.
+
+Walks an Alfresco folder tree, finds ZIP nodes and submits each one to
+the same ``process_scorm_zip`` pipeline used for live events, as a
+synthetic ``BINARY_CHANGED`` event.
+
+Design principles:
+- Bounded parallelism (max in-flight tasks) and a submission rate limit
+- Resumable: completed nodes are checkpointed to a JSON file, an
+  interrupted run skips them when started again
+- Observable: periodic throughput / failure reports and a final summary
+
+Usage::
+
+    python -m consumer.backfill <folder-node-id> \\
+        --checkpoint backfill.json --concurrency 32 --rate 5
+"""
+
+import argparse
+import json
+import logging
+import os
+import signal
+import sys
+import time
+from collections import deque
+from typing import Dict, Iterator, Optional
+
+from consumer.publisher import publisher
+from core import tunables
+from core.failures import is_rejection
+from core.logging_config import setup_logging
+from core.schema import is_zip_content
+from core.settings import settings
+from core.task_names import PROCESS_SCORM_ZIP
+from core.tracing import ENQUEUED_AT
+
+logger = logging.getLogger("autotag.consumer.backfill")
+
+
+_shutdown_requested: bool = False
+
+
+def _handle_shutdown(signum, frame) -> None:
+    """
+    Stop submitting new work; in-flight tasks are drained.
+    """
+    global _shutdown_requested
+    logger.warning("Shutdown signal received", extra={"signal": signum})
+    _shutdown_requested = True
+
+
+class Checkpoint:
+    """
+    JSON checkpoint of a backfill run.
+
+    Parameters
+    ----------
+    path : str
+        Checkpoint file location.
+    root_id : str
+        Root folder node id the checkpoint belongs to.
+    """
+
+    def __init__(self, path: str, root_id: str):
+        self.path = path
+        self.root_id = root_id
+        self.done: set = set()
+        self.failed: Dict[str, str] = {}
+
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("root") != root_id:
+                raise ValueError(
+                    f"Checkpoint {path} belongs to root {data.get('root')}, not {root_id}"
+                )
+            self.done = set(data.get("done", []))
+            self.failed = dict(data.get("failed", {}))
+
+    def save(self) -> None:
+        """
+        Atomically persist the checkpoint.
+        """
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(
+                {"root": self.root_id, "done": sorted(self.done), "failed": self.failed},
+                f,
+            )
+        os.replace(tmp, self.path)
+
+
+class Backfill:
+    """
+    Submit ZIP nodes of a folder tree with bounded parallelism.
+
+    Parameters
+    ----------
+    client : AlfrescoClient
+        Client used to walk the folder tree.
+    checkpoint : Checkpoint
+        Progress store.
+    concurrency : int
+        Maximum number of tasks in flight.
+    rate : float
+        Maximum task submissions per second.
+    retry_failed : bool
+        Resubmit nodes that failed in a previous run.
+    """
+
+    REPORT_INTERVAL = 10.0
+    CHECKPOINT_INTERVAL = 5.0
+    POLL_INTERVAL = 0.25
+
+    def __init__(self, client, checkpoint: Checkpoint, concurrency: int, rate: float, retry_failed: bool):
+        self.client = client
+        self.checkpoint = checkpoint
+        self.concurrency = concurrency
+        self.interval = 1.0 / rate
+        self.retry_failed = retry_failed
+
+        self.in_flight: Dict[str, tuple] = {}
+        self.completions: deque = deque()
+        self.submitted = 0
+        self.succeeded = 0
+        self.failures = 0
+        self.started = time.monotonic()
+        self._next_submit = 0.0
+        self._last_report = self.started
+        self._last_checkpoint = self.started
+
+    # ------------------------------------------------------------------
+    # Discovery
+    # ------------------------------------------------------------------
+    def iter_zip_nodes(self, root_id: str) -> Iterator[dict]:
+        """
+        Breadth-first walk of the tree yielding ZIP file entries.
+
+        Each folder is listed completely before any of its ZIPs is
+        yielded: submitted packages create their extraction folder next
+        to the ZIP, which would shift the ``skipCount`` paging of a
+        listing still in progress. Extraction folders (named after a
+        sibling ZIP) are not descended into.
+        """
+        folders = deque([root_id])
+
+        while folders:
+            folder_id = folders.popleft()
+            children = list(self.client.iter_children(folder_id))
+
+            zips = [e for e in children if e.get("isFile") and self._is_zip(e)]
+            targets = {os.path.splitext(e["name"])[0] for e in zips}
+
+            folders.extend(
+                e["id"]
+                for e in children
+                if e.get("isFolder") and e["name"] not in targets
+            )
+            yield from zips
+
+    @staticmethod
+    def _is_zip(entry: dict) -> bool:
+        # Same filter as the worker, which would skip anything else
+        # and report it as done
+        mime_type = (entry.get("content") or {}).get("mimeType")
+        return is_zip_content(entry["name"], mime_type)
+
+    @staticmethod
+    def to_event(entry: dict) -> dict:
+        """
+        Build a synthetic BINARY_CHANGED RepoEvent payload for a node.
+        """
+        content = entry.get("content") or {}
+        properties = entry.get("properties") or {}
+
+        return {
+            "schemaVersion": 1,
+            "eventType": "BINARY_CHANGED",
+            "timestamp": int(time.time() * 1000),
+            "nodeRef": f"workspace://SpacesStore/{entry['id']}",
+            "storeRef": "workspace://SpacesStore",
+            "parentNodeRef": f"workspace://SpacesStore/{entry['parentId']}",
+            "name": entry["name"],
+            "mimeType": content.get("mimeType"),
+            "size": content.get("sizeInBytes"),
+            "encoding": content.get("encoding"),
+            "versionLabel": properties.get("cm:versionLabel"),
+            "creator": (entry.get("createdByUser") or {}).get("id"),
+            "modifier": (entry.get("modifiedByUser") or {}).get("id"),
+            "createdAt": entry.get("createdAt"),
+            "modifiedAt": entry.get("modifiedAt"),
+            "nodeType": entry.get("nodeType"),
+        }
+
+    # ------------------------------------------------------------------
+    # Execution
+    # ------------------------------------------------------------------
+    def run(self, root_id: str) -> None:
+        """
+        Walk the tree and process every pending ZIP node.
+        """
+        for entry in self.iter_zip_nodes(root_id):
+            if _shutdown_requested:
+                break
+
+            node_id = entry["id"]
+            if node_id in self.checkpoint.done:
+                continue
+            if node_id in self.checkpoint.failed and not self.retry_failed:
+                continue
+
+            while len(self.in_flight) >= self.concurrency:
+                self._reap()
+                time.sleep(self.POLL_INTERVAL)
+
+            self._throttle()
+            self._submit(node_id, entry)
+            self._reap()
+
+        while self.in_flight:
+            self._reap()
+            time.sleep(self.POLL_INTERVAL)
+
+        self.checkpoint.save()
+        self._report(final=True)
+
+    def _throttle(self) -> None:
+        now = time.monotonic()
+        if now < self._next_submit:
+            time.sleep(self._next_submit - now)
+        self._next_submit = max(now, self._next_submit) + self.interval
+
+    def _submit(self, node_id: str, entry: dict) -> None:
+        result = publisher.send(
+            PROCESS_SCORM_ZIP,
+            args=[self.to_event(entry)],
+            headers={ENQUEUED_AT: time.time()},
+        )
+        self.in_flight[node_id] = (result, time.monotonic())
+        self.submitted += 1
+
+    def _reap(self) -> None:
+        now = time.monotonic()
+        timeout = tunables.get().WORKER_TIMEOUT
+
+        for node_id, (result, submitted_at) in list(self.in_flight.items()):
+            if result.ready():
+                error = self._error_of(result)
+                result.forget()
+            elif now - submitted_at > timeout:
+                error = f"Timed out after {timeout}s"
+            else:
+                continue
+
+            del self.in_flight[node_id]
+            self.completions.append(now)
+
+            if error is None:
+                self.succeeded += 1
+                self.checkpoint.done.add(node_id)
+                self.checkpoint.failed.pop(node_id, None)
+            else:
+                self.failures += 1
+                self.checkpoint.failed[node_id] = error
+                logger.warning("Backfill item failed", extra={"node_id": node_id, "error": error})
+
+        if now - self._last_checkpoint >= self.CHECKPOINT_INTERVAL:
+            self.checkpoint.save()
+            self._last_checkpoint = now
+
+        if now - self._last_report >= self.REPORT_INTERVAL:
+            self._report()
+            self._last_report = now
+
+    @staticmethod
+    def _error_of(result) -> Optional[str]:
+        if not result.successful():
+            return f"{type(result.result).__name__}: {result.result}"
+        if is_rejection(result.result):
+            error = result.result["error"]
+            return f"Rejected: {error['type']}: {error['message']}"
+        if result.result is not True:
+            return f"Unexpected result: {result.result!r}"
+        return None
+
+    def _report(self, final: bool = False) -> None:
+        now = time.monotonic()
+        while self.completions and now - self.completions[0] > 60:
+            self.completions.popleft()
+
+        elapsed = now - self.started
+        logger.info(
+            "Backfill finished" if final else "Backfill progress",
+            extra={
+                "submitted": self.submitted,
+                "succeeded": self.succeeded,
+                "failed": self.failures,
+                "in_flight": len(self.in_flight),
+                "per_minute_last_60s": len(self.completions),
+                "per_second_overall": round((self.succeeded + self.failures) / elapsed, 2) if elapsed else 0,
+                "elapsed_s": round(elapsed),
+            },
+        )
+
+
+def main(argv=None) -> None:
+    """
+    Backfill entry point.
+    """
+    parser = argparse.ArgumentParser(description="Reprocess SCORM ZIPs under an Alfresco folder tree")
+    parser.add_argument("root_id", help="Node id of the folder to walk")
+    parser.add_argument("--checkpoint", default=None, help="Checkpoint file (default: backfill-<root_id>.json)")
+    parser.add_argument("--concurrency", type=int, default=16, help="Max tasks in flight")
+    parser.add_argument("--rate", type=float, default=5.0, help="Max submissions per second")
+    parser.add_argument("--skip-failed", action="store_true", help="Do not retry nodes that failed previously")
+    args = parser.parse_args(argv)
+
+    setup_logging(settings.LOG_LEVEL)
+
+    signal.signal(signal.SIGTERM, _handle_shutdown)
+    signal.signal(signal.SIGINT, _handle_shutdown)
+
+    from workers.alfresco import build_alfresco_client
+
+    checkpoint = Checkpoint(args.checkpoint or f"backfill-{args.root_id}.json", args.root_id)
+
+    logger.info(
+        "Starting backfill",
+        extra={
+            "root": args.root_id,
+            "already_done": len(checkpoint.done),
+            "previously_failed": len(checkpoint.failed),
+        },
+    )
+
+    backfill = Backfill(
+        build_alfresco_client(),
+        checkpoint,
+        concurrency=args.concurrency,
+        rate=args.rate,
+        retry_failed=not args.skip_failed,
+    )
+
+    try:
+        backfill.run(args.root_id)
+    except Exception:
+        checkpoint.save()
+        logger.exception("Fatal backfill error")
+        sys.exit(1)
+
+    if backfill.failures:
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
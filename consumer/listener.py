@@ -8,23 +8,51 @@ This listener consumes events routed from the Alfresco Event Router,
 validates them against the canonical schema, and delegates processing
 to Celery workers.
 
+Messages are validated on the STOMP receiver thread, then handed to
+the weighted fair scheduler (see ``consumer.scheduler``) which
+dispatches them to Celery within each queue's budget.
+
 Design principles:
 - Fail fast on invalid messages
 - ACK only after successful processing
 - NO ACK on recoverable failures (broker redelivery)
+- Dead-letter + ACK on permanent failures (never redelivered)
 - No business logic in the listener
 """
 
 import json
 import logging
+import time
 import stomp
 
+from consumer.publisher import publisher
+from core import tunables
+from core.failures import BYPASS_NEGATIVE_CACHE, REPLAY_HEADER, is_rejection, rejection
+from core.metrics import Counter, Histogram, register, write_textfile
 from core.schema import RepoEvent
 from core.settings import settings
-from workers.tasks import process_scorm_zip
+from core.task_names import PROCESS_SCORM_ZIP
+from core.tracing import ENQUEUED_AT, inject, start_span
 
 logger = logging.getLogger(__name__)
 
+EVENT_LAG = register(
+    Histogram(
+        "scorm_event_lag_seconds",
+        "Time from repository event to listener receipt / processing completion",
+        buckets=(1, 5, 15, 30, 60, 120, 300, 600, 1200, 1800, 3600, 7200),
+        label_names=("queue", "stage"),
+    )
+)
+MESSAGES = register(
+    Counter(
+        "scorm_messages_total",
+        "Messages handled per queue and outcome "
+        "(completed, rejected, failed, invalid, ignored)",
+        label_names=("queue", "outcome"),
+    )
+)
+
 
 class QueueEventListener(stomp.ConnectionListener):
     """
@@ -36,9 +64,22 @@ class QueueEventListener(stomp.ConnectionListener):
     - Filter unsupported events
     - Dispatch work to Celery
     - Control ACK / NO-ACK semantics
+    - Dead-letter permanent failures
+
+    Parameters
+    ----------
+    conn : stomp.Connection12
+        Connection used for ACKs and dead-lettering.
+    scheduler : WeightedFairScheduler
+        Dispatcher shared by all subscribed queues.
+    subscriptions : SubscriptionManager
+        Maps subscription ids to queues; its ``send_lock`` serialises
+        frames sent from the dispatch threads.
     """
-    def __init__(self, conn):
+    def __init__(self, conn, scheduler, subscriptions):
         self.conn = conn
+        self.scheduler = scheduler
+        self.subscriptions = subscriptions
 
     def on_message(self, frame):
         """
@@ -48,8 +89,10 @@ class QueueEventListener(stomp.ConnectionListener):
         1. Parse JSON payload
         2. Validate against RepoEvent schema
         3. Filter unsupported event types
-        4. Dispatch to Celery worker
-        5. ACK on success, NO ACK on failure
+        4. Queue for dispatch on the message's queue
+
+        Permanent failures (malformed message) are published to
+        ``ACTIVEMQ_DLQ`` and ACKed right away.
 
         Parameters
         ----------
@@ -59,30 +102,136 @@ class QueueEventListener(stomp.ConnectionListener):
         ack_id = frame.headers["ack"]
         sub_id = frame.headers["subscription"]
 
-        try:
-            payload = json.loads(frame.body)
+        queue = self.subscriptions.queue_of(sub_id)
+        if queue is None:
+            # Late frame of a closed subscription: redelivered by the broker
+            logger.debug("Ignoring message of closed subscription %s", sub_id)
+            return
 
-            event = RepoEvent.model_validate(payload)
+        try:
+            try:
+                payload = json.loads(frame.body)
+                event = RepoEvent.model_validate(payload)
+            except ValueError as exc:
+                self._dead_letter(
+                    frame, rejection(type(exc).__name__, str(exc))
+                )
+                self._ack(ack_id, sub_id)
+                MESSAGES.inc(queue=queue, outcome="invalid")
+                return
 
             if event.eventType != "BINARY_CHANGED":
                 self._ack(ack_id, sub_id)
+                MESSAGES.inc(queue=queue, outcome="ignored")
                 return
 
-            result = process_scorm_zip.apply_async(
-                args=[payload]
-            ).get(timeout=settings.WORKER_TIMEOUT)
+            EVENT_LAG.observe(
+                time.time() - event.event_time(), queue=queue, stage="received"
+            )
 
-            if result is True:
-                self._ack(ack_id, sub_id)
-                logger.info("ACKed %s", ack_id)
-            else:
-                raise RuntimeError("Worker failed")
+            self.scheduler.submit(
+                queue, lambda: self._dispatch(frame, queue, payload, event)
+            )
 
         except Exception:
             logger.exception("Processing failed – NO ACK")
 
-    def _ack(self, ack_id, sub_id):
-        self.conn.send_frame(
-            "ACK",
-            headers={"id": ack_id, "subscription": sub_id},
+        finally:
+            write_textfile()
+
+    def _dispatch(self, frame, queue, payload, event):
+        """
+        Run one message through the worker pipeline (dispatch thread).
+
+        ACK on success, dead-letter + ACK on a rejection result,
+        NO ACK on transient failure.
+        """
+        ack_id = frame.headers["ack"]
+        sub_id = frame.headers["subscription"]
+
+        try:
+            with start_span(
+                "listener.dispatch",
+                {"node_ref": event.nodeRef, "message_id": ack_id, "queue": queue},
+            ) as span:
+                span.set_attribute("event.lag_seconds", time.time() - event.event_time())
+
+                headers = {**inject(), ENQUEUED_AT: time.time()}
+                if frame.headers.get(REPLAY_HEADER) == "true":
+                    headers[BYPASS_NEGATIVE_CACHE] = True
+
+                result = publisher.send(
+                    PROCESS_SCORM_ZIP,
+                    args=[payload],
+                    headers=headers,
+                ).get(timeout=tunables.get().WORKER_TIMEOUT)
+
+                if is_rejection(result):
+                    span.set_attribute("rejected", True)
+                    self._dead_letter(frame, result)
+                    outcome = "rejected"
+                elif result is not True:
+                    raise RuntimeError("Worker failed")
+                else:
+                    EVENT_LAG.observe(
+                        time.time() - event.event_time(),
+                        queue=queue,
+                        stage="completed",
+                    )
+                    outcome = "completed"
+
+            self._ack(ack_id, sub_id)
+            MESSAGES.inc(queue=queue, outcome=outcome)
+            logger.info("ACKed %s", ack_id)
+
+        except Exception:
+            MESSAGES.inc(queue=queue, outcome="failed")
+            logger.exception("Processing failed – NO ACK")
+
+        finally:
+            write_textfile()
+
+    def _dead_letter(self, frame, result):
+        """
+        Publish a permanently failed message with its error details.
+
+        Raises if the broker send fails, so the message is not ACKed.
+        """
+        body = frame.body
+        if isinstance(body, bytes):
+            body = body.decode("utf-8", errors="replace")
+
+        message = json.dumps(
+            {
+                "error": result["error"],
+                "cached": result.get("cached", False),
+                "failedAt": int(time.time() * 1000),
+                "originalDestination": frame.headers.get("destination"),
+                "originalMessageId": frame.headers.get("message-id"),
+                "originalBody": body,
+            }
         )
+
+        with self.subscriptions.send_lock:
+            self.conn.send(
+                destination=settings.ACTIVEMQ_DLQ,
+                body=message,
+                content_type="application/json",
+                headers={"persistent": "true"},
+            )
+
+        logger.warning(
+            "Dead-lettered message",
+            extra={
+                "message_id": frame.headers.get("message-id"),
+                "error": result["error"]["type"],
+                "dlq": settings.ACTIVEMQ_DLQ,
+            },
+        )
+
+    def _ack(self, ack_id, sub_id):
+        with self.subscriptions.send_lock:
+            self.conn.send_frame(
+                "ACK",
+                headers={"id": ack_id, "subscription": sub_id},
+            )
@@ -4,22 +4,31 @@ consumer.main
 
 Application entry point for the queue-based auto-tag consumer.
 
-This service consumes messages from a feature-specific ActiveMQ queue,
-delegates processing to Celery workers, and manages lifecycle concerns
-such as startup, shutdown, and broker connectivity.
+This service consumes messages from one or more ActiveMQ queues
+(``ACTIVEMQ_QUEUES``, or the single ``ACTIVEMQ_QUEUE``), delegates
+processing to Celery workers under a weighted fair share of the
+dispatch capacity, and manages lifecycle concerns such as startup,
+shutdown, and broker connectivity.
+
+Queue budgets and the dispatch capacity are live tunables (see
+``core.tunables``): changes are applied without a restart.
 """
 
 import logging
 import signal
 import sys
+import threading
 import time
-from typing import Optional
+from typing import List, Optional
 
 import stomp
 
-from core.settings import settings
+from core import tunables
+from core.settings import QueueSubscription, settings
 from core.logging_config import setup_logging
 from consumer.listener import QueueEventListener
+from consumer.scheduler import WeightedFairScheduler
+from consumer.subscriptions import SubscriptionManager
 
 logger = logging.getLogger("autotag.consumer.main")
 
@@ -60,6 +69,36 @@ def _create_connection() -> stomp.Connection12:
     )
 
 
+def _configured_queues(values) -> List[QueueSubscription]:
+    """
+    Queues to consume.
+
+    Parameters
+    ----------
+    values : Tunables
+        Current tunables.
+
+    Returns
+    -------
+    List[QueueSubscription]
+        ``ACTIVEMQ_QUEUES`` or, when empty, ``ACTIVEMQ_QUEUE`` with
+        ``ACTIVEMQ_PREFETCH`` (up to that many in flight).
+    """
+    if values.ACTIVEMQ_QUEUES:
+        return list(values.ACTIVEMQ_QUEUES)
+
+    if not settings.ACTIVEMQ_QUEUE:
+        raise ValueError("Set ACTIVEMQ_QUEUES or ACTIVEMQ_QUEUE")
+
+    return [
+        QueueSubscription(
+            destination=settings.ACTIVEMQ_QUEUE,
+            prefetch=values.ACTIVEMQ_PREFETCH,
+            max_in_flight=values.ACTIVEMQ_PREFETCH,
+        )
+    ]
+
+
 def main() -> None:
     """
     Application entry point.
@@ -72,13 +111,22 @@ def main() -> None:
     signal.signal(signal.SIGINT, _handle_shutdown)
 
     conn: Optional[stomp.Connection12] = None
+    scheduler: Optional[WeightedFairScheduler] = None
 
     try:
+        values = tunables.get()
+        queues = _configured_queues(values)
+        scheduler = WeightedFairScheduler(
+            queues, capacity=values.CONSUMER_DISPATCH_CAPACITY
+        )
+        scheduler.start()
+
         conn = _create_connection()
+        subscriptions = SubscriptionManager(conn, scheduler, threading.Lock())
 
         conn.set_listener(
             "queue-consumer",
-            QueueEventListener(conn),
+            QueueEventListener(conn, scheduler, subscriptions),
         )
 
         conn.connect(
@@ -95,22 +143,16 @@ def main() -> None:
             },
         )
 
-        conn.subscribe(
-            destination=settings.ACTIVEMQ_QUEUE,
-            id="queue-consumer",
-            ack="client-individual",
-            headers={
-                "activemq.prefetchSize": str(settings.ACTIVEMQ_PREFETCH),
-            },
-        )
+        subscriptions.subscribe_all(queues)
 
-        logger.info(
-            "Subscribed to queue",
-            extra={
-                "queue": settings.ACTIVEMQ_QUEUE,
-                "prefetch": settings.ACTIVEMQ_PREFETCH,
-            },
-        )
+        def _apply_tunables(old, new) -> None:
+            if new.CONSUMER_DISPATCH_CAPACITY != old.CONSUMER_DISPATCH_CAPACITY:
+                scheduler.set_capacity(new.CONSUMER_DISPATCH_CAPACITY)
+            if _configured_queues(new) != _configured_queues(old):
+                subscriptions.apply(_configured_queues(new))
+
+        tunables.on_change(_apply_tunables)
+        tunables.watch()
 
         while not _shutdown_requested:
             time.sleep(1)
@@ -120,6 +162,12 @@ def main() -> None:
         sys.exit(1)
 
     finally:
+        if scheduler:
+            # Pending messages stay unACKed and are redelivered
+            scheduler.close()
+            if not scheduler.drain(tunables.get().WORKER_TIMEOUT):
+                logger.warning("In-flight messages did not finish before shutdown")
+
         if conn and conn.is_connected():
             logger.info("Disconnecting from ActiveMQ")
             conn.disconnect()
@@ -0,0 +1,79 @@
+"""
+consumer.publisher
+==================
+
+Lightweight Celery task publisher for the queue consumer.
+
+The consumer only publishes messages and waits for results; it never
+executes tasks. Dispatching by registered task name (see
+``core.task_names``) keeps the worker stack (``workers.tasks``,
+``services.*``, ``requests``) out of the consumer process, and the
+Celery client itself is imported lazily on first publish.
+"""
+
+import threading
+from typing import Any, Dict, List, Optional
+
+from core.celery_config import CELERY_APP_NAME, CELERY_CONF
+from core.settings import settings
+
+
+class TaskPublisher:
+    """
+    Publish Celery tasks by name without importing their code.
+
+    The underlying Celery app has no task discovery and is created
+    on first use.
+    """
+
+    def __init__(self):
+        self._app = None
+        self._lock = threading.Lock()
+
+    @property
+    def app(self):
+        """
+        Celery client application (created lazily).
+        """
+        if self._app is None:
+            with self._lock:
+                if self._app is None:
+                    from celery import Celery
+
+                    app = Celery(
+                        CELERY_APP_NAME,
+                        broker=settings.CELERY_BROKER_URL,
+                        backend=settings.CELERY_RESULT_BACKEND,
+                    )
+                    app.conf.update(CELERY_CONF)
+                    self._app = app
+        return self._app
+
+    def send(
+        self,
+        task_name: str,
+        args: Optional[List[Any]] = None,
+        headers: Optional[Dict[str, Any]] = None,
+    ):
+        """
+        Publish a task by name.
+
+        Parameters
+        ----------
+        task_name : str
+            Registered task name.
+        args : list, optional
+            Positional task arguments (JSON-serializable).
+        headers : dict, optional
+            Extra message headers.
+
+        Returns
+        -------
+        celery.result.AsyncResult
+            Handle to wait for the task result.
+        """
+        return self.app.send_task(task_name, args=args or [], headers=headers)
+
+
+# Singleton publisher instance
+publisher = TaskPublisher()
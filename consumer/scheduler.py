@@ -0,0 +1,268 @@
+"""
+consumer.scheduler
+==================
+
+Weighted fair dispatch of messages received from several queues.
+
+Received messages wait in a FIFO per queue. A pool of dispatch
+threads (the capacity shared by all queues) serves them. Each thread
+takes the next message from the queue with the lowest virtual time,
+among the queues that have pending messages and are below their
+``max_in_flight``.
+
+Every dispatch advances the queue's virtual time by ``1 / weight``,
+so queues that all have backlog share the capacity in proportion to
+their weights. A queue coming back from idle starts at the current
+virtual time, so it cannot burst on credit saved while it was idle
+(start-time fair queuing). One tenant's bulk upload therefore delays
+other tenants by at most its fair share.
+
+Capacity, weights and ``max_in_flight`` can be changed while running.
+A queue can also be held: it keeps receiving but stops dispatching,
+which lets the consumer drain it before resubscribing (see
+``consumer.subscriptions``).
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Optional, Sequence, Tuple
+
+from core.metrics import Gauge, register
+from core.settings import QueueSubscription
+
+logger = logging.getLogger(__name__)
+
+Job = Callable[[], None]
+
+QUEUE_PENDING = register(
+    Gauge(
+        "scorm_queue_pending_messages",
+        "Messages received and waiting for dispatch capacity",
+        label_names=("queue",),
+    )
+)
+QUEUE_IN_FLIGHT = register(
+    Gauge(
+        "scorm_queue_in_flight_messages",
+        "Messages currently dispatched to workers",
+        label_names=("queue",),
+    )
+)
+
+
+class _QueueState:
+    """
+    Scheduling state of one queue.
+    """
+
+    def __init__(self, config: QueueSubscription):
+        self.config = config
+        self.pending: Deque[Job] = deque()
+        self.in_flight = 0
+        self.vtime = 0.0
+        self.held = False
+
+    def eligible(self) -> bool:
+        return (
+            not self.held
+            and bool(self.pending)
+            and self.in_flight < self.config.max_in_flight
+        )
+
+    def publish(self) -> None:
+        QUEUE_PENDING.set(len(self.pending), queue=self.config.destination)
+        QUEUE_IN_FLIGHT.set(self.in_flight, queue=self.config.destination)
+
+
+class WeightedFairScheduler:
+    """
+    Share a dispatch capacity between queues by weight.
+
+    Parameters
+    ----------
+    queues : Sequence[QueueSubscription]
+        Consumed queues with their budgets.
+    capacity : int
+        Number of dispatch threads (messages processed concurrently).
+    """
+
+    def __init__(self, queues: Sequence[QueueSubscription], capacity: int):
+        self._states: Dict[str, _QueueState] = {
+            q.destination: _QueueState(q) for q in queues
+        }
+        self._cond = threading.Condition()
+        self._vtime = 0.0
+        self._closed = False
+        self._capacity = capacity
+        self._threads = 0
+        self._started = False
+
+        for state in self._states.values():
+            state.publish()
+
+    def start(self) -> None:
+        with self._cond:
+            self._started = True
+        self.set_capacity(self._capacity)
+
+    def set_capacity(self, capacity: int) -> None:
+        """
+        Resize the dispatch pool. Surplus threads exit once their
+        current job is done.
+        """
+        with self._cond:
+            self._capacity = capacity
+            missing = capacity - self._threads if self._started else 0
+            self._threads += max(missing, 0)
+            self._cond.notify_all()
+
+        for _ in range(missing):
+            threading.Thread(target=self._run, name="dispatch", daemon=True).start()
+
+    def configure(self, config: QueueSubscription) -> None:
+        """
+        Add a queue, or apply a new weight / ``max_in_flight`` to it.
+        """
+        with self._cond:
+            state = self._states.get(config.destination)
+            if state is None:
+                state = self._states[config.destination] = _QueueState(config)
+                state.vtime = self._vtime
+            state.config = config
+            state.publish()
+            self._cond.notify_all()
+
+    def hold(self, destination: str) -> None:
+        """
+        Stop dispatching a queue; new jobs are kept pending.
+        """
+        with self._cond:
+            self._states[destination].held = True
+
+    def release(self, destination: str) -> None:
+        """
+        Drop a held queue's pending jobs and resume dispatching it.
+        """
+        with self._cond:
+            state = self._states[destination]
+            state.pending.clear()
+            state.held = False
+            state.publish()
+
+    def remove(self, destination: str) -> None:
+        """
+        Forget an idle queue and its pending jobs.
+        """
+        with self._cond:
+            state = self._states.pop(destination)
+            state.pending.clear()
+            state.publish()
+
+    def wait_idle(self, destination: str, timeout: float) -> bool:
+        """
+        Wait until a queue has no job in flight.
+        """
+        deadline = time.monotonic() + timeout
+
+        with self._cond:
+            while self._states[destination].in_flight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+
+        return True
+
+    def submit(self, destination: str, job: Job) -> None:
+        """
+        Queue a job for a queue's share of the dispatch capacity.
+
+        Raises
+        ------
+        KeyError
+            ``destination`` is not a configured queue.
+        """
+        with self._cond:
+            state = self._states[destination]
+
+            # Idle queue: rejoin at the current virtual time
+            if not state.pending and state.in_flight == 0:
+                state.vtime = max(state.vtime, self._vtime)
+
+            state.pending.append(job)
+            state.publish()
+            self._cond.notify()
+
+    def close(self) -> None:
+        """
+        Stop dispatching. Pending jobs are dropped (their messages are
+        unacknowledged, so the broker redelivers them).
+        """
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def drain(self, timeout: float) -> bool:
+        """
+        Wait for in-flight jobs to finish.
+
+        Returns
+        -------
+        bool
+            False if jobs were still running when ``timeout`` expired.
+        """
+        deadline = time.monotonic() + timeout
+
+        with self._cond:
+            while any(s.in_flight for s in self._states.values()):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+
+        return True
+
+    def _next(self) -> Optional[Tuple[_QueueState, Job]]:
+        with self._cond:
+            while True:
+                if self._closed:
+                    return None
+
+                if self._threads > self._capacity:
+                    self._threads -= 1
+                    return None
+
+                eligible = [s for s in self._states.values() if s.eligible()]
+                if eligible:
+                    state = min(eligible, key=lambda s: s.vtime)
+                    job = state.pending.popleft()
+                    state.in_flight += 1
+
+                    self._vtime = state.vtime
+                    state.vtime += 1.0 / state.config.weight
+                    state.publish()
+                    return state, job
+
+                self._cond.wait()
+
+    def _run(self) -> None:
+        while True:
+            item = self._next()
+            if item is None:
+                return
+
+            state, job = item
+            try:
+                job()
+            except Exception:
+                logger.exception(
+                    "Dispatch job failed",
+                    extra={"queue": state.config.destination},
+                )
+            finally:
+                with self._cond:
+                    state.in_flight -= 1
+                    state.publish()
+                    self._cond.notify_all()
@@ -0,0 +1,217 @@
+"""
+consumer.subscriptions
+======================
+
+STOMP subscriptions of the consumer, reconfigurable while running.
+
+Queue budgets (``ACTIVEMQ_QUEUES``) are live tunables. A change is
+applied as follows:
+- weight / max_in_flight: set on the scheduler immediately
+- added queue: subscribed
+- prefetch: the queue is drained, then resubscribed
+- removed queue: the queue is drained, then unsubscribed
+
+Draining holds the queue: messages delivered meanwhile are not
+dispatched. Once the queue's in-flight messages are ACKed, the
+subscription is closed. The held messages were never processed, so
+the broker redelivers them to the new subscription. Each subscription
+gets a fresh id. Late frames of a closed subscription are therefore
+recognised and left unACKed. A queue still busy after the drain
+timeout is released and keeps its subscription, and the change is
+retried.
+
+Changes are applied by a single reconciler thread, which always
+applies the latest requested configuration: quick successive changes
+cannot be applied out of order.
+"""
+
+import itertools
+import logging
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from core import tunables
+from core.settings import QueueSubscription
+from consumer.scheduler import WeightedFairScheduler
+
+logger = logging.getLogger(__name__)
+
+# Margin on top of WORKER_TIMEOUT when waiting for a queue to drain
+DRAIN_GRACE_SECONDS = 30
+
+
+class SubscriptionManager:
+    """
+    Own the consumer's queue subscriptions.
+
+    Parameters
+    ----------
+    conn : stomp.Connection12
+        Connected STOMP connection.
+    scheduler : WeightedFairScheduler
+        Dispatcher the subscribed queues feed.
+    send_lock : threading.Lock
+        Lock serialising frames sent on ``conn`` (shared with the
+        listener).
+    """
+
+    def __init__(self, conn, scheduler: WeightedFairScheduler, send_lock: threading.Lock):
+        self.conn = conn
+        self.scheduler = scheduler
+        self.send_lock = send_lock
+
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        # Latest requested configuration, applied by the reconciler
+        self._pending: Optional[List[QueueSubscription]] = None
+        self._changed = threading.Event()
+        self._reconciler: Optional[threading.Thread] = None
+        # destination -> (subscription id, config)
+        self._active: Dict[str, Tuple[str, QueueSubscription]] = {}
+        # subscription id -> destination
+        self._by_id: Dict[str, str] = {}
+
+    def queue_of(self, subscription_id: str) -> Optional[str]:
+        """
+        Destination of an open subscription, None for a closed one.
+        """
+        with self._lock:
+            return self._by_id.get(subscription_id)
+
+    def subscribe_all(self, queues: Sequence[QueueSubscription]) -> None:
+        for queue in queues:
+            self._subscribe(queue)
+
+    def apply(self, queues: Sequence[QueueSubscription]) -> None:
+        """
+        Request reconciliation with new queue budgets. The reconciler
+        thread applies it in the background (draining waits for
+        in-flight messages); a newer request supersedes one not yet
+        applied.
+        """
+        with self._lock:
+            self._pending = list(queues)
+            if self._reconciler is None:
+                self._reconciler = threading.Thread(
+                    target=self._reconcile,
+                    name="subscriptions-reconciler",
+                    daemon=True,
+                )
+                self._reconciler.start()
+
+        self._changed.set()
+
+    def _reconcile(self) -> None:
+        retry = False
+
+        while True:
+            # After an incomplete pass, retry even without a new change
+            self._changed.wait(DRAIN_GRACE_SECONDS if retry else None)
+            self._changed.clear()
+
+            with self._lock:
+                queues = self._pending
+
+            try:
+                retry = not self._apply(queues)
+            except Exception:
+                logger.exception("Failed to apply queue subscriptions")
+                retry = True
+
+    def _apply(self, queues) -> bool:
+        """
+        Reconcile subscriptions with ``queues``. Returns False when a
+        queue could not be drained and its change was postponed.
+        """
+        wanted = {q.destination: q for q in queues}
+
+        with self._lock:
+            current = {dest: config for dest, (_, config) in self._active.items()}
+
+        complete = True
+
+        for dest in current.keys() - wanted.keys():
+            if not self._drain(dest):
+                complete = False
+                continue
+            self.scheduler.remove(dest)
+            logger.warning("Unsubscribed from queue", extra={"queue": dest})
+
+        for dest, queue in wanted.items():
+            old = current.get(dest)
+
+            if old is None:
+                self._subscribe(queue)
+            elif old.prefetch != queue.prefetch:
+                if not self._drain(dest):
+                    complete = False
+                    continue
+                self.scheduler.release(dest)
+                self._subscribe(queue)
+            elif old != queue:
+                self.scheduler.configure(queue)
+                with self._lock:
+                    self._active[dest] = (self._active[dest][0], queue)
+
+        return complete
+
+    def _subscribe(self, queue: QueueSubscription) -> None:
+        subscription_id = f"{queue.destination}#{next(self._ids)}"
+
+        self.scheduler.configure(queue)
+
+        with self._lock:
+            self._active[queue.destination] = (subscription_id, queue)
+            self._by_id[subscription_id] = queue.destination
+
+        with self.send_lock:
+            self.conn.subscribe(
+                destination=queue.destination,
+                id=subscription_id,
+                ack="client-individual",
+                headers={
+                    "activemq.prefetchSize": str(queue.prefetch),
+                },
+            )
+
+        logger.info(
+            "Subscribed to queue",
+            extra={
+                "queue": queue.destination,
+                "subscription": subscription_id,
+                "prefetch": queue.prefetch,
+                "max_in_flight": queue.max_in_flight,
+                "weight": queue.weight,
+            },
+        )
+
+    def _drain(self, destination: str) -> bool:
+        """
+        Hold a queue, wait for its in-flight messages, then close its
+        subscription.
+
+        Returns False, with the queue released and its subscription
+        left open, when messages are still in flight after
+        ``WORKER_TIMEOUT`` plus ``DRAIN_GRACE_SECONDS``: closing the
+        subscription would fail their ACKs and make the broker
+        redeliver messages being processed.
+        """
+        self.scheduler.hold(destination)
+
+        timeout = tunables.get().WORKER_TIMEOUT + DRAIN_GRACE_SECONDS
+        if not self.scheduler.wait_idle(destination, timeout):
+            self.scheduler.release(destination)
+            logger.warning(
+                "Queue still busy after drain timeout, change postponed",
+                extra={"queue": destination, "timeout": timeout},
+            )
+            return False
+
+        with self._lock:
+            subscription_id, _ = self._active.pop(destination)
+            del self._by_id[subscription_id]
+
+        with self.send_lock:
+            self.conn.unsubscribe(id=subscription_id)
+
+        return True
@@ -0,0 +1,24 @@
+"""
+core.celery_config
+==================
+
+Celery configuration shared by workers and task publishers.
+
+Kept free of Celery imports so that both the worker application and
+the lightweight consumer-side publisher can apply the exact same
+serialization and delivery settings.
+"""
+
+CELERY_APP_NAME = "alfresco_ai"
+
+CELERY_CONF = {
+    "task_serializer": "json",
+    "accept_content": ["json"],
+    "result_serializer": "json",
+
+    "timezone": "UTC",
+    "enable_utc": True,
+
+    "task_acks_late": True,
+    "worker_prefetch_multiplier": 1,
+}
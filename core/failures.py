@@ -0,0 +1,61 @@
+"""
+core.failures
+=============
+
+Task result contract for permanent failures.
+
+Workers do not raise permanent failures (invalid SCORM package, unsafe
+ZIP, malformed event): retrying or redelivering them can never
+succeed. Instead they return a *rejection* result, which the listener
+publishes to the dead-letter destination before ACKing the message.
+
+A rejection is a JSON-serializable dict::
+
+    {
+        "status": "rejected",
+        "error": {"type": "...", "message": "...", "details": ...},
+        "cached": false
+    }
+
+Rejections are cached per node version (``workers.negative_cache``).
+A message replayed from the dead-letter destination with the STOMP
+header ``scorm-replay: true`` is processed again regardless: the
+listener forwards it to the worker with the ``bypass_negative_cache``
+task header.
+"""
+
+from typing import Any, Dict, Optional
+
+REJECTED = "rejected"
+
+# STOMP header marking a replayed message
+REPLAY_HEADER = "scorm-replay"
+# Celery task header: skip the negative cache lookup
+BYPASS_NEGATIVE_CACHE = "bypass_negative_cache"
+
+
+def rejection(error_type: str, message: str, details: Optional[Any] = None) -> Dict[str, Any]:
+    """
+    Build a rejection result.
+
+    Parameters
+    ----------
+    error_type : str
+        Exception class name (or other stable error code).
+    message : str
+        Human-readable description.
+    details : Any, optional
+        Extra JSON-serializable context (e.g. validation errors).
+    """
+    return {
+        "status": REJECTED,
+        "error": {"type": error_type, "message": message, "details": details},
+        "cached": False,
+    }
+
+
+def is_rejection(result: Any) -> bool:
+    """
+    Whether a task result is a rejection.
+    """
+    return isinstance(result, dict) and result.get("status") == REJECTED
@@ -0,0 +1,170 @@
+"""
+core.metrics
+============
+
+In-process metrics rendered in the Prometheus text exposition format.
+
+Metrics are written to ``METRICS_TEXTFILE`` (when configured) with an
+atomic rename, so a node-exporter textfile collector or any sidecar
+can scrape them and alerting rules can be built on top.
+
+Only what the services need is implemented: labelled counters, gauges
+and histograms.
+"""
+
+import logging
+import os
+import threading
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from core.settings import settings
+
+logger = logging.getLogger(__name__)
+
+LabelValues = Tuple[str, ...]
+
+
+class _Sample:
+    """
+    Labelled metric holding one value per label set.
+    """
+
+    TYPE = ""
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels[n]) for n in self.label_names)
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} {self.TYPE}"
+
+        with self._lock:
+            snapshot = dict(self._values)
+
+        for key, value in snapshot.items():
+            yield f"{self.name}{_labels(list(zip(self.label_names, key)))} {value:g}"
+
+
+class Counter(_Sample):
+    """
+    Monotonic counter (rate() of it gives throughput).
+    """
+
+    TYPE = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(_Sample):
+    """
+    Point-in-time value.
+    """
+
+    TYPE = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+
+class Histogram:
+    """
+    Cumulative histogram with fixed buckets.
+
+    Parameters
+    ----------
+    name : str
+        Metric name.
+    help_text : str
+        Metric description.
+    buckets : Sequence[float]
+        Upper bounds (``+Inf`` is implicit).
+    label_names : Sequence[str]
+        Label names, values are given per observation.
+    """
+
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float], label_names: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = sorted(buckets)
+        self.label_names = tuple(label_names)
+        self._series: Dict[LabelValues, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels[n]) for n in self.label_names)
+
+        with self._lock:
+            # [bucket counts..., +Inf count, sum]
+            series = self._series.setdefault(key, [0.0] * (len(self.buckets) + 2))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} histogram"
+
+        with self._lock:
+            snapshot = {k: list(v) for k, v in self._series.items()}
+
+        for key, series in snapshot.items():
+            labels = list(zip(self.label_names, key))
+            for bound, count in zip(self.buckets, series):
+                yield f"{self.name}_bucket{_labels(labels + [('le', repr(float(bound)))])} {count:g}"
+            yield f"{self.name}_bucket{_labels(labels + [('le', '+Inf')])} {series[-2]:g}"
+            yield f"{self.name}_count{_labels(labels)} {series[-2]:g}"
+            yield f"{self.name}_sum{_labels(labels)} {series[-1]}"
+
+
+def _labels(pairs: List[Tuple[str, str]]) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+
+_registry: List[object] = []
+_write_lock = threading.Lock()
+
+
+def register(metric):
+    """
+    Add a metric to the set written by ``write_textfile``.
+    """
+    _registry.append(metric)
+    return metric
+
+
+def write_textfile() -> None:
+    """
+    Atomically write all registered metrics to ``METRICS_TEXTFILE``.
+
+    No-op when no textfile is configured.
+    """
+    path = settings.METRICS_TEXTFILE
+    if not path:
+        return
+
+    lines = [line for metric in _registry for line in metric.render()]
+    tmp = f"{path}.{os.getpid()}.tmp"
+
+    try:
+        with _write_lock:
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+            os.replace(tmp, path)
+    except OSError:
+        logger.warning("Metrics textfile write failed", extra={"path": path})
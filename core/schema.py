@@ -16,6 +16,18 @@ Design goals:
 from typing import Optional, Union
 from pydantic import BaseModel, field_validator
 
+ZIP_MIME_TYPE = "application/zip"
+
+
+def is_zip_content(name: Optional[str], mime_type: Optional[str]) -> bool:
+    """
+    Whether a node is a ZIP the workers process: a ``.zip`` name and no
+    MIME type other than ``application/zip``.
+    """
+    if not name or not name.lower().endswith(".zip"):
+        return False
+    return not mime_type or mime_type == ZIP_MIME_TYPE
+
 
 class RepoEvent(BaseModel):
     # -------- Core envelope --------
@@ -37,6 +49,7 @@ class RepoEvent(BaseModel):
     size: Optional[int] = None
     encoding: Optional[str] = None
     versionLabel: Optional[str] = None
+    contentUrl: Optional[str] = None
 
     # -------- Audit metadata --------
     creator: Optional[str] = None
@@ -64,5 +77,14 @@ class RepoEvent(BaseModel):
             return v
         raise ValueError("Invalid timestamp format")
 
+    def event_time(self) -> float:
+        """
+        Event timestamp as epoch seconds (producers send epoch millis;
+        epoch seconds are tolerated).
+        """
+        if self.timestamp > 10_000_000_000:
+            return self.timestamp / 1000
+        return float(self.timestamp)
+
     class Config:
         extra = "ignore"
@@ -18,9 +18,31 @@ Fail-fast validation is intentionally relaxed (Optional fields)
 to allow worker-only processes to start without ActiveMQ settings.
 """
 
-from pydantic import Field
+from pydantic import BaseModel, Field
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import List, Literal, Optional
+
+
+class QueueSubscription(BaseModel):
+    """
+    A consumed queue and its dispatch budget.
+
+    Attributes
+    ----------
+    destination : str
+        STOMP destination, e.g. ``/queue/scorm.tenant-a``.
+    prefetch : int
+        Messages the broker may push to this subscription unacknowledged.
+    max_in_flight : int
+        Messages of this queue dispatched to workers at the same time.
+    weight : float
+        Share of the dispatch capacity when queues compete for it.
+    """
+
+    destination: str
+    prefetch: int = Field(default=1, ge=1)
+    max_in_flight: int = Field(default=1, ge=1)
+    weight: float = Field(default=1.0, gt=0)
 
 
 class Settings(BaseSettings):
@@ -59,6 +81,25 @@ class Settings(BaseSettings):
         description="Queue to consume auto-tag events from",
     )
 
+    ACTIVEMQ_QUEUES: List[QueueSubscription] = Field(
+        default_factory=list,
+        description=(
+            "Queues to consume as a JSON list of {destination, prefetch, "
+            "max_in_flight, weight}; when empty, ACTIVEMQ_QUEUE is consumed "
+            "with ACTIVEMQ_PREFETCH"
+        ),
+    )
+    CONSUMER_DISPATCH_CAPACITY: int = Field(
+        default=4,
+        ge=1,
+        description="Messages dispatched to workers concurrently, shared by all queues",
+    )
+
+    ACTIVEMQ_DLQ: str = Field(
+        default="/queue/scorm.extraction.dlq",
+        description="Dead-letter destination for permanently failed messages",
+    )
+
     ACTIVEMQ_PREFETCH: int = Field(
         default=1,
         ge=1,
@@ -106,6 +147,78 @@ class Settings(BaseSettings):
         description="Maximum time (seconds) to wait for worker result",
     )
 
+    WORKER_CONCURRENCY: Optional[int] = Field(
+        default=None,
+        ge=1,
+        description="Worker pool size; unset keeps the size given on the command line",
+    )
+
+    WORKER_EXECUTION_MODE: Literal["sync", "async"] = Field(
+        default="sync",
+        description=(
+            "Package pipeline implementation: blocking ('sync') or asyncio "
+            "('async', meant for --pool=threads)"
+        ),
+    )
+    ASYNC_MAX_IN_FLIGHT_REQUESTS: int = Field(
+        default=200,
+        ge=1,
+        description="Async mode: Alfresco requests in flight per worker process, across packages",
+    )
+
+    NEGATIVE_CACHE_TTL: int = Field(
+        default=7 * 24 * 3600,
+        ge=0,
+        description="Seconds a rejected node version is remembered (0 disables)",
+    )
+
+    # ------------------------------------------------------------------
+    # Package file filtering
+    # ------------------------------------------------------------------
+    SCORM_FILTER_DENY_GLOBS: List[str] = Field(
+        default_factory=lambda: [
+            "__MACOSX",
+            ".DS_Store",
+            "._*",
+            "Thumbs.db",
+            "desktop.ini",
+            "*.psd",
+            "*.fla",
+            "*.bak",
+            "*~",
+            ".git",
+            ".svn",
+        ],
+        description="Globs (path or path component) of ZIP members never uploaded (JSON list)",
+    )
+    SCORM_FILTER_STRICT_MANIFEST: bool = Field(
+        default=False,
+        description="Upload only files reachable from imsmanifest.xml resources",
+    )
+
+    # ------------------------------------------------------------------
+    # Staged (fan-out) processing of large packages
+    # ------------------------------------------------------------------
+    SCORM_STAGING_DIR: Optional[str] = Field(
+        default=None,
+        description="Shared directory for staged packages (unset disables fan-out)",
+    )
+    SCORM_FANOUT_MIN_FILES: int = Field(
+        default=2_000,
+        ge=1,
+        description="File count at or above which a package is fanned out",
+    )
+    SCORM_FANOUT_MIN_BYTES: int = Field(
+        default=1024 ** 3,
+        ge=1,
+        description="Uncompressed size at or above which a package is fanned out",
+    )
+    SCORM_FANOUT_SHARD_SIZE: int = Field(
+        default=500,
+        ge=1,
+        description="Number of files uploaded by each upload-shard task",
+    )
+
     # ------------------------------------------------------------------
     # Alfresco API
     # ------------------------------------------------------------------
@@ -122,6 +235,133 @@ class Settings(BaseSettings):
         description="Alfresco service password",
         repr=False,
     )
+    CONTENTSTORE_ROOT: Optional[str] = Field(
+        default=None,
+        description=(
+            "Local (read-only) mount of the Alfresco contentstore; when set, "
+            "binaries are read in place, falling back to HTTP download"
+        ),
+    )
+    ALFRESCO_UPLOAD_CHUNK_SIZE: int = Field(
+        default=1024 * 1024,
+        ge=4096,
+        description="Bytes read per chunk when streaming uploads (bounds memory per upload)",
+    )
+
+    # ------------------------------------------------------------------
+    # Alfresco request governor (cluster-wide, Redis-backed)
+    # ------------------------------------------------------------------
+    ALFRESCO_GOVERNOR_ENABLED: bool = Field(
+        default=True,
+        description="Enforce shared Alfresco request budgets across workers",
+    )
+    ALFRESCO_UPLOAD_RATE: float = Field(
+        default=20.0,
+        gt=0,
+        description="Max cluster-wide file uploads per second",
+    )
+    ALFRESCO_FOLDER_RATE: float = Field(
+        default=10.0,
+        gt=0,
+        description="Max cluster-wide folder creations per second",
+    )
+    ALFRESCO_DOWNLOAD_RATE: float = Field(
+        default=5.0,
+        gt=0,
+        description="Max cluster-wide content downloads per second",
+    )
+    ALFRESCO_LIST_RATE: float = Field(
+        default=10.0,
+        gt=0,
+        description="Max cluster-wide folder listing requests per second",
+    )
+    ALFRESCO_GOVERNOR_LATENCY_THRESHOLD: float = Field(
+        default=5.0,
+        gt=0,
+        description="Response time (seconds) treated as a congestion signal",
+    )
+    ALFRESCO_GOVERNOR_BACKOFF_FACTOR: float = Field(
+        default=0.5,
+        gt=0,
+        lt=1,
+        description="Rate multiplier applied on 429/503 or slow responses",
+    )
+    ALFRESCO_GOVERNOR_RECOVERY_STEP: float = Field(
+        default=0.02,
+        gt=0,
+        le=1,
+        description="Fraction of max rate regained per healthy response",
+    )
+    ALFRESCO_GOVERNOR_MIN_RATE_FRACTION: float = Field(
+        default=0.05,
+        gt=0,
+        le=1,
+        description="Lowest adaptive rate, as a fraction of max rate",
+    )
+
+    # ------------------------------------------------------------------
+    # Tracing & metrics
+    # ------------------------------------------------------------------
+    TRACE_EXPORTER: Literal["none", "file", "otlp"] = Field(
+        default="none",
+        description="Where finished spans are exported",
+    )
+    TRACE_FILE: Optional[str] = Field(
+        default=None,
+        description="JSON-lines span file (TRACE_EXPORTER=file)",
+    )
+    TRACE_OTLP_ENDPOINT: Optional[str] = Field(
+        default=None,
+        description="OTLP/HTTP traces endpoint, e.g. http://collector:4318/v1/traces",
+    )
+    TRACE_SERVICE_NAME: str = Field(
+        default="scorm-extraction",
+        description="service.name attached to exported spans",
+    )
+    METRICS_TEXTFILE: Optional[str] = Field(
+        default=None,
+        description="Prometheus textfile the consumer writes its metrics to",
+    )
+
+    # ------------------------------------------------------------------
+    # On-demand task profiling
+    # ------------------------------------------------------------------
+    PROFILE_DIR: Optional[str] = Field(
+        default=None,
+        description="Directory for task profiles (unset disables profiling)",
+    )
+    PROFILE_ENABLED: bool = Field(
+        default=False,
+        description="Profile every process_scorm_zip run",
+    )
+    PROFILE_MIN_SIZE_BYTES: Optional[int] = Field(
+        default=None,
+        ge=1,
+        description="Profile runs whose event size is at least this many bytes",
+    )
+    PROFILE_SAMPLE_RATE: float = Field(
+        default=0.0,
+        ge=0,
+        le=1,
+        description="Fraction of runs profiled at random",
+    )
+
+    # ------------------------------------------------------------------
+    # Live tunables (see core.tunables)
+    # ------------------------------------------------------------------
+    TUNABLES_FILE: Optional[str] = Field(
+        default=None,
+        description="JSON file of hot-reloadable overrides",
+    )
+    TUNABLES_REDIS_KEY: Optional[str] = Field(
+        default=None,
+        description="Redis key (db 3) holding JSON hot-reloadable overrides",
+    )
+    TUNABLES_POLL_INTERVAL: float = Field(
+        default=5.0,
+        gt=0,
+        description="Seconds between checks of the tunables source",
+    )
 
     # ------------------------------------------------------------------
     # Logging
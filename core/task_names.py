@@ -0,0 +1,13 @@
+"""
+core.task_names
+===============
+
+Registered Celery task names.
+
+Publishers dispatch work by name so they never have to import the
+worker stack (``workers.tasks`` and everything under ``services``).
+Tasks declare the same names explicitly, so renaming or moving a
+task function cannot silently break dispatch.
+"""
+
+PROCESS_SCORM_ZIP = "workers.tasks.process_scorm_zip"
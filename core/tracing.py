@@ -0,0 +1,310 @@
+"""
+core.tracing
+============
+
+Minimal distributed tracing for the consumer → Celery → Alfresco path.
+
+Spans are propagated across process boundaries with a W3C
+``traceparent`` header (STOMP listener → Celery task headers) and
+within a process through a context variable, so nested calls such as
+``AlfrescoClient`` requests attach to the active task span
+automatically.
+
+Finished spans are exported according to ``TRACE_EXPORTER``:
+- ``none``  nothing is exported (spans are still propagated)
+- ``file``  one JSON object per line appended to ``TRACE_FILE``
+- ``otlp``  batched OTLP/HTTP JSON POSTs to ``TRACE_OTLP_ENDPOINT``
+
+Only the standard library is used, so tracing adds no dependencies to
+the lean consumer process. The HTTP stack used by the OTLP exporter
+is imported only when spans are actually shipped.
+"""
+
+import atexit
+import contextvars
+import json
+import logging
+import os
+import queue
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+from core.settings import settings
+
+logger = logging.getLogger(__name__)
+
+TRACEPARENT = "traceparent"
+# Epoch seconds at which a message was published (queue-wait measurement)
+ENQUEUED_AT = "enqueued_at"
+
+
+@dataclass(frozen=True)
+class SpanContext:
+    """
+    Identity of a span, as carried across process boundaries.
+    """
+    trace_id: str
+    span_id: str
+
+
+@dataclass
+class Span:
+    """
+    A timed operation within a trace.
+    """
+    name: str
+    context: SpanContext
+    parent_id: Optional[str] = None
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: Optional[int] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """
+        Render the span in OTLP/JSON form.
+        """
+        span = {
+            "traceId": self.context.trace_id,
+            "spanId": self.context.span_id,
+            "name": self.name,
+            "kind": 1,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [_otlp_attribute(k, v) for k, v in self.attributes.items()],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+_current: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar(
+    "current_span", default=None
+)
+
+
+def _otlp_attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        typed = {"boolValue": value}
+    elif isinstance(value, int):
+        typed = {"intValue": str(value)}
+    elif isinstance(value, float):
+        typed = {"doubleValue": value}
+    else:
+        typed = {"stringValue": str(value)}
+    return {"key": key, "value": typed}
+
+
+def current_span() -> Optional[Span]:
+    """
+    Return the active span of the current context, if any.
+    """
+    return _current.get()
+
+
+@contextmanager
+def start_span(
+    name: str,
+    attributes: Optional[Dict[str, Any]] = None,
+    parent: Optional[SpanContext] = None,
+) -> Iterator[Span]:
+    """
+    Start a span as a child of ``parent`` or of the active span.
+
+    Parameters
+    ----------
+    name : str
+        Span name.
+    attributes : dict, optional
+        Initial span attributes.
+    parent : SpanContext, optional
+        Remote parent (e.g. extracted from task headers). Defaults to
+        the active span of the current context.
+    """
+    if parent is None:
+        active = _current.get()
+        parent = active.context if active else None
+
+    span = Span(
+        name=name,
+        context=SpanContext(
+            trace_id=parent.trace_id if parent else secrets.token_hex(16),
+            span_id=secrets.token_hex(8),
+        ),
+        parent_id=parent.span_id if parent else None,
+        attributes=dict(attributes or {}),
+    )
+
+    token = _current.set(span)
+    try:
+        yield span
+    except BaseException as exc:
+        span.error = f"{type(exc).__name__}: {exc}"
+        raise
+    finally:
+        _current.reset(token)
+        span.end_ns = time.time_ns()
+        _export(span)
+
+
+def inject() -> Dict[str, str]:
+    """
+    Headers propagating the active span to another process.
+    """
+    span = _current.get()
+    if span is None:
+        return {}
+    return {TRACEPARENT: f"00-{span.context.trace_id}-{span.context.span_id}-01"}
+
+
+def extract(traceparent: Optional[str]) -> Optional[SpanContext]:
+    """
+    Parse a W3C ``traceparent`` header value.
+    """
+    if not traceparent:
+        return None
+
+    parts = traceparent.split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+
+    return SpanContext(trace_id=parts[1], span_id=parts[2])
+
+
+# ----------------------------------------------------------------------
+# Exporters
+# ----------------------------------------------------------------------
+class FileSpanExporter:
+    """
+    Append spans as JSON lines to a local file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(
+            {"service": settings.TRACE_SERVICE_NAME, **span.to_otlp()}
+        )
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+class OtlpSpanExporter:
+    """
+    Batch spans and POST them to an OTLP/HTTP (JSON) collector.
+
+    Spans are queued and shipped by a daemon thread, so exporting never
+    blocks the traced code path. Spans are dropped (not blocked on) when
+    the queue is full.
+    """
+
+    def __init__(self, endpoint: str, batch_size: int = 512, interval: float = 2.0):
+        self.endpoint = endpoint
+        self.batch_size = batch_size
+        self.interval = interval
+        self._queue: "queue.Queue[Span]" = queue.Queue(maxsize=batch_size * 20)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        atexit.register(self.flush)
+
+    def export(self, span: Span) -> None:
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            pass
+
+    def flush(self) -> None:
+        batch: List[Span] = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+            if len(batch) >= self.batch_size:
+                self._send(batch)
+                batch = []
+        if batch:
+            self._send(batch)
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.interval)
+            self.flush()
+
+    def _send(self, spans: List[Span]) -> None:
+        # Imported here: urllib.request pulls in http.client and ssl,
+        # which processes not exporting to OTLP never need
+        import urllib.request
+
+        body = {
+            "resourceSpans": [{
+                "resource": {
+                    "attributes": [
+                        _otlp_attribute("service.name", settings.TRACE_SERVICE_NAME)
+                    ]
+                },
+                "scopeSpans": [{
+                    "scope": {"name": __name__},
+                    "spans": [s.to_otlp() for s in spans],
+                }],
+            }]
+        }
+        request = urllib.request.Request(
+            self.endpoint,
+            data=json.dumps(body).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=5):
+                pass
+        except Exception:
+            logger.warning("Span export failed", extra={"spans": len(spans)})
+
+
+_exporter = None
+_exporter_pid: Optional[int] = None
+_exporter_lock = threading.Lock()
+
+
+def _get_exporter():
+    """
+    Build the configured exporter once per process (fork-safe).
+    """
+    global _exporter, _exporter_pid
+
+    if _exporter_pid == os.getpid():
+        return _exporter
+
+    with _exporter_lock:
+        if _exporter_pid != os.getpid():
+            kind = settings.TRACE_EXPORTER
+            if kind == "file" and settings.TRACE_FILE:
+                _exporter = FileSpanExporter(settings.TRACE_FILE)
+            elif kind == "otlp" and settings.TRACE_OTLP_ENDPOINT:
+                _exporter = OtlpSpanExporter(settings.TRACE_OTLP_ENDPOINT)
+            else:
+                _exporter = None
+            _exporter_pid = os.getpid()
+
+    return _exporter
+
+
+def _export(span: Span) -> None:
+    exporter = _get_exporter()
+    if exporter is None:
+        return
+    try:
+        exporter.export(span)
+    except Exception:
+        logger.warning("Span export failed", extra={"span": span.name})
@@ -0,0 +1,210 @@
+"""
+core.tunables
+=============
+
+Hot-reloadable performance tunables.
+
+``core.settings`` is static configuration, read once from the
+environment. The fields listed in ``HOT_FIELDS`` can also be changed
+while the consumer and workers run. Changes are made through a JSON
+document in a watched file (``TUNABLES_FILE``) or a Redis key
+(``TUNABLES_REDIS_KEY``)::
+
+    {"WORKER_TIMEOUT": 900, "ALFRESCO_UPLOAD_RATE": 5}
+
+The document holds overrides only. Fields it omits keep their
+environment value, so removing a field restores that value.
+
+- Validation uses the field definitions of ``Settings``. An invalid
+  document, or one with unknown fields, is logged and ignored, and the
+  previous values stay in force.
+- Every changed field is logged with its old and new value.
+- Readers call ``get()``, which re-reads the source at most every
+  ``TUNABLES_POLL_INTERVAL`` seconds. Forked worker children therefore
+  see changes without running a thread.
+- Services that must react to changes register ``on_change`` callbacks
+  and call ``watch()``. This starts a polling thread, so the callbacks
+  fire even when nothing calls ``get()``.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from pydantic import ConfigDict, create_model
+
+from core.settings import Settings, settings
+
+logger = logging.getLogger(__name__)
+
+HOT_FIELDS = (
+    "ACTIVEMQ_QUEUES",
+    "ACTIVEMQ_PREFETCH",
+    "CONSUMER_DISPATCH_CAPACITY",
+    "WORKER_TIMEOUT",
+    "WORKER_CONCURRENCY",
+    "ASYNC_MAX_IN_FLIGHT_REQUESTS",
+    "ALFRESCO_UPLOAD_RATE",
+    "ALFRESCO_FOLDER_RATE",
+    "ALFRESCO_DOWNLOAD_RATE",
+    "ALFRESCO_LIST_RATE",
+)
+
+Tunables = create_model(
+    "Tunables",
+    __config__=ConfigDict(extra="forbid", frozen=True),
+    **{
+        name: (Settings.model_fields[name].annotation, Settings.model_fields[name])
+        for name in HOT_FIELDS
+    },
+)
+
+Subscriber = Callable[[Any, Any], None]
+
+_lock = threading.Lock()
+_current = None
+_raw: Optional[str] = None
+_checked_at = 0.0
+_subscribers: List[Subscriber] = []
+_watcher_pid: Optional[int] = None
+_redis = None
+
+
+def _baseline() -> Dict[str, Any]:
+    return {name: getattr(settings, name) for name in HOT_FIELDS}
+
+
+def _read_source() -> Optional[str]:
+    """
+    Raw override document, or None when there is none.
+    """
+    if settings.TUNABLES_FILE:
+        try:
+            with open(settings.TUNABLES_FILE, encoding="utf-8") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    if settings.TUNABLES_REDIS_KEY:
+        global _redis
+        if _redis is None:
+            import redis
+
+            _redis = redis.Redis(
+                host=settings.REDIS_HOST,
+                port=settings.REDIS_PORT,
+                db=3,
+            )
+        value = _redis.get(settings.TUNABLES_REDIS_KEY)
+        return value.decode("utf-8") if value is not None else None
+
+    return None
+
+
+def _changes(old, new) -> Dict[str, tuple]:
+    return {
+        name: (getattr(old, name), getattr(new, name))
+        for name in HOT_FIELDS
+        if getattr(old, name) != getattr(new, name)
+    }
+
+
+def refresh():
+    """
+    Re-read the source now and apply a changed document.
+
+    Returns
+    -------
+    Tunables
+        Values in force after the refresh.
+    """
+    global _current, _raw, _checked_at
+
+    with _lock:
+        _checked_at = time.monotonic()
+
+        try:
+            raw = _read_source()
+        except Exception:
+            logger.warning("Tunables source unreadable, keeping current values", exc_info=True)
+            raw = _raw
+
+        if _current is not None and raw == _raw:
+            return _current
+
+        try:
+            overrides = json.loads(raw) if raw and raw.strip() else {}
+            if not isinstance(overrides, dict):
+                raise ValueError("Tunables document must be a JSON object")
+            new = Tunables.model_validate({**_baseline(), **overrides})
+        except ValueError as exc:
+            logger.error("Invalid tunables ignored", extra={"error": str(exc)})
+            _raw = raw
+            if _current is None:
+                _current = Tunables.model_validate(_baseline())
+            return _current
+
+        old, _current, _raw = _current, new, raw
+
+    if old is None:
+        if raw:
+            logger.info("Tunables loaded", extra={"overrides": raw})
+        return new
+
+    changes = _changes(old, new)
+    for name, (before, after) in changes.items():
+        logger.warning(
+            "Tunable changed",
+            extra={"tunable": name, "old": str(before), "new": str(after)},
+        )
+
+    if changes:
+        for callback in list(_subscribers):
+            try:
+                callback(old, new)
+            except Exception:
+                logger.exception("Tunables subscriber failed")
+
+    return new
+
+
+def get():
+    """
+    Current tunables, re-reading the source when the poll interval has
+    elapsed.
+    """
+    if _current is None or time.monotonic() - _checked_at >= settings.TUNABLES_POLL_INTERVAL:
+        return refresh()
+    return _current
+
+
+def on_change(callback: Subscriber) -> None:
+    """
+    Call ``callback(old, new)`` after every applied change.
+    """
+    _subscribers.append(callback)
+
+
+def watch() -> None:
+    """
+    Poll the source in a daemon thread (once per process).
+    """
+    global _watcher_pid
+
+    if not (settings.TUNABLES_FILE or settings.TUNABLES_REDIS_KEY):
+        return
+
+    with _lock:
+        if _watcher_pid == os.getpid():
+            return
+        _watcher_pid = os.getpid()
+
+    def _poll() -> None:
+        while True:
+            time.sleep(settings.TUNABLES_POLL_INTERVAL)
+            refresh()
+
+    threading.Thread(target=_poll, name="tunables-watch", daemon=True).start()
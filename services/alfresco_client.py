@@ -1,35 +1,163 @@
+import time
 import requests
 import shutil
+from typing import BinaryIO, Iterator, Optional, Union
 from requests.auth import HTTPBasicAuth
 
+from core.tracing import start_span
+from services.multipart import MultipartStream
+from services.request_governor import DOWNLOAD, FOLDER, LIST, UPLOAD, parse_retry_after
+
 
 class AlfrescoClient:
-    def __init__(self, base_url: str, username: str, password: str):
+    def __init__(
+        self,
+        base_url: str,
+        username: str,
+        password: str,
+        governor=None,
+        upload_chunk_size: int = 1024 * 1024,
+    ):
         self.base_url = base_url.rstrip("/")
         self.auth = HTTPBasicAuth(username, password)
+        self.governor = governor
+        self.upload_chunk_size = upload_chunk_size
+
+    def _request(self, kind: str, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Issue a request through the cluster-wide governor (if any),
+        reporting status, latency, ``Retry-After`` and connection
+        failures back so the shared rate adapts.
+        Each call is traced as a child of the active span.
+        """
+        with start_span(f"alfresco.{kind}", {"http.method": method}) as span:
+            if self.governor is not None:
+                waited = time.monotonic()
+                self.governor.acquire(kind)
+                span.set_attribute("governor.wait_seconds", time.monotonic() - waited)
+
+            started = time.monotonic()
+            try:
+                r = requests.request(method, url, auth=self.auth, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                # Dropped connections are the overload signal too
+                if self.governor is not None:
+                    self.governor.record(kind, None, time.monotonic() - started)
+                raise
+            # Latency is time to headers after the body went out: a large
+            # upload is slow to send, not a sign of server congestion
+            sent_at = getattr(kwargs.get("data"), "sent_at", None)
+            elapsed = time.monotonic() - (sent_at or started)
+
+            span.set_attribute("http.status_code", r.status_code)
+
+            if self.governor is not None:
+                self.governor.record(
+                    kind,
+                    r.status_code,
+                    elapsed,
+                    parse_retry_after(r.headers.get("Retry-After")),
+                )
+
+            return r
 
     def download_content(self, node_id: str, target_path: str):
         url = f"{self.base_url}/alfresco/api/-default-/public/alfresco/versions/1/nodes/{node_id}/content"
 
-        with requests.get(url, auth=self.auth, stream=True) as r:
+        with self._request(DOWNLOAD, "GET", url, stream=True) as r:
             r.raise_for_status()
             with open(target_path, "wb") as f:
                 shutil.copyfileobj(r.raw, f)
 
+    def iter_children(self, node_id: str, page_size: int = 100) -> Iterator[dict]:
+        """
+        Yield child node entries of a folder, following pagination.
+        """
+        url = f"{self.base_url}/alfresco/api/-default-/public/alfresco/versions/1/nodes/{node_id}/children"
+        skip = 0
+
+        while True:
+            params = {
+                "skipCount": skip,
+                "maxItems": page_size,
+                "include": "properties",
+            }
+            r = self._request(LIST, "GET", url, params=params)
+            r.raise_for_status()
+            page = r.json()["list"]
+
+            for item in page["entries"]:
+                yield item["entry"]
+
+            if not page["pagination"].get("hasMoreItems"):
+                return
+            skip += len(page["entries"])
+
     def create_folder(self, name: str, parent_id: str) -> str:
+        """
+        Create a folder, or reuse an existing folder of the same name
+        (a replayed or retried package).
+        """
         url = f"{self.base_url}/alfresco/api/-default-/public/alfresco/versions/1/nodes/{parent_id}/children"
 
         payload = {"name": name, "nodeType": "cm:folder"}
-        r = requests.post(url, json=payload, auth=self.auth)
+        r = self._request(FOLDER, "POST", url, json=payload)
+
+        if r.status_code == 409:
+            existing = self.get_child(parent_id, name)
+            if existing is not None and existing.get("isFolder"):
+                return existing["id"]
+
         r.raise_for_status()
         return r.json()["entry"]["id"]
 
-    def upload_file(self, parent_id: str, file_path: str, file_name: str):
+    def get_child(self, parent_id: str, name: str) -> Optional[dict]:
+        """
+        Entry of the child named ``name`` of a folder, None if absent.
+        """
+        url = f"{self.base_url}/alfresco/api/-default-/public/alfresco/versions/1/nodes/{parent_id}"
+
+        r = self._request(LIST, "GET", url, params={"relativePath": name})
+        if r.status_code == 404:
+            return None
+        r.raise_for_status()
+        return r.json()["entry"]
+
+    def upload_file(
+        self,
+        parent_id: str,
+        file_path: Union[str, BinaryIO],
+        file_name: str,
+        size: Optional[int] = None,
+    ):
+        """
+        Upload a file as a streamed multipart body. An existing file of
+        the same name is overwritten (new version), so re-uploading a
+        package never leaves renamed copies.
+
+        :param file_path: Local path, or an open binary stream such as a
+                          zip member (pass ``size`` to avoid chunked transfer)
+        """
         url = f"{self.base_url}/alfresco/api/-default-/public/alfresco/versions/1/nodes/{parent_id}/children"
 
-        with open(file_path, "rb") as f:
-            files = {"filedata": (file_name, f)}
-            data = {"name": file_name, "nodeType": "cm:content", "autoRename": "true"}
-            r = requests.post(url, files=files, data=data, auth=self.auth)
-            r.raise_for_status()
-            return r.json()["entry"]["id"]
+        body = MultipartStream(
+            {"name": file_name, "nodeType": "cm:content", "overwrite": "true"},
+            "filedata",
+            file_name,
+            file_path,
+            size=size,
+            chunk_size=self.upload_chunk_size,
+        )
+        try:
+            r = self._request(
+                UPLOAD,
+                "POST",
+                url,
+                data=body,
+                headers={"Content-Type": body.content_type},
+            )
+        finally:
+            body.close()
+
+        r.raise_for_status()
+        return r.json()["entry"]["id"]
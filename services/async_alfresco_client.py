@@ -0,0 +1,229 @@
+import asyncio
+import time
+from contextlib import contextmanager, nullcontext
+from types import SimpleNamespace
+from typing import Callable, ContextManager, Optional
+
+import aiohttp
+
+from core.tracing import start_span
+from services.exceptions import AlfrescoDownloadError, AlfrescoUploadError
+from services.request_governor import DOWNLOAD, FOLDER, LIST, UPLOAD, parse_retry_after
+
+
+class AsyncAlfrescoClient:
+    """
+    asyncio counterpart of ``AlfrescoClient``.
+
+    All requests share one connection pool and one semaphore, so a
+    single instance bounds the Alfresco requests in flight across every
+    package processed on its event loop. Error responses raise
+    ``AlfrescoDownloadError`` / ``AlfrescoUploadError``.
+
+    The session is opened lazily: create, use and close an instance on
+    the same event loop.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        username: str,
+        password: str,
+        max_in_flight: int = 200,
+        governor=None,
+        download_chunk_size: int = 1024 * 1024,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.auth = aiohttp.BasicAuth(username, password)
+        self.max_in_flight = max_in_flight
+        self.governor = governor
+        self.download_chunk_size = download_chunk_size
+
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            trace = aiohttp.TraceConfig()
+            trace.on_request_chunk_sent.append(_on_chunk_sent)
+
+            self._session = aiohttp.ClientSession(
+                auth=self.auth,
+                trace_configs=[trace],
+                # Unbounded: the (resizable) semaphore is the limit
+                connector=aiohttp.TCPConnector(limit=0),
+                timeout=aiohttp.ClientTimeout(total=None, sock_connect=30, sock_read=300),
+            )
+        return self._session
+
+    def set_max_in_flight(self, max_in_flight: int):
+        """
+        Change the in-flight bound. Requests already holding a slot of
+        the previous semaphore finish normally.
+        """
+        self.max_in_flight = max_in_flight
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+
+    async def _acquire(self, kind: str):
+        """
+        Wait for a governor token without blocking the event loop.
+        """
+        while True:
+            wait = await asyncio.to_thread(self.governor.try_acquire, kind)
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    async def _request(
+        self,
+        kind: str,
+        method: str,
+        url: str,
+        handle,
+        body: Optional[Callable[[], ContextManager]] = None,
+        **kwargs,
+    ):
+        """
+        Issue a request through the in-flight semaphore and the governor
+        (if any), then pass the open response to ``handle``. Outcomes,
+        including connection failures, are reported to the governor.
+        Each call is traced as a child of the active span.
+
+        ``body`` opens the request data only once a slot is held, so
+        the semaphore also bounds the files open in the process.
+        """
+        with start_span(f"alfresco.{kind}", {"http.method": method}) as span:
+            # Slot first: only requests holding one poll the governor
+            async with self._semaphore:
+                if self.governor is not None:
+                    waited = time.monotonic()
+                    await self._acquire(kind)
+                    span.set_attribute("governor.wait_seconds", time.monotonic() - waited)
+
+                sent = SimpleNamespace(at=None)
+                with (body() if body is not None else nullcontext()) as data:
+                    if data is not None:
+                        kwargs["data"] = data
+
+                    started = time.monotonic()
+                    recorded = False
+                    try:
+                        async with self.session.request(method, url, trace_request_ctx=sent, **kwargs) as r:
+                            # Time to headers after the body went out (see AlfrescoClient)
+                            elapsed = time.monotonic() - (sent.at or started)
+                            span.set_attribute("http.status_code", r.status)
+
+                            if self.governor is not None:
+                                await asyncio.to_thread(
+                                    self.governor.record,
+                                    kind,
+                                    r.status,
+                                    elapsed,
+                                    parse_retry_after(r.headers.get("Retry-After")),
+                                )
+                            recorded = True
+
+                            if r.status >= 400:
+                                text = await r.text()
+                                error = AlfrescoDownloadError if kind == DOWNLOAD else AlfrescoUploadError
+                                raise error(
+                                    f"{method} {url} failed with {r.status}: {text[:200]}",
+                                    status_code=r.status,
+                                )
+
+                            return await handle(r)
+                    except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                        # Dropped connections are the overload signal too
+                        if self.governor is not None and not recorded:
+                            await asyncio.to_thread(
+                                self.governor.record, kind, None, time.monotonic() - started
+                            )
+                        raise
+
+    async def download_content(self, node_id: str, target_path: str):
+        url = f"{self.base_url}/alfresco/api/-default-/public/alfresco/versions/1/nodes/{node_id}/content"
+
+        async def save(r):
+            # File I/O in the default executor, off the shared loop
+            f = await asyncio.to_thread(open, target_path, "wb")
+            try:
+                async for chunk in r.content.iter_chunked(self.download_chunk_size):
+                    await asyncio.to_thread(f.write, chunk)
+            finally:
+                await asyncio.to_thread(f.close)
+
+        await self._request(DOWNLOAD, "GET", url, save)
+
+    async def create_folder(self, name: str, parent_id: str) -> str:
+        """
+        Create a folder, or reuse an existing folder of the same name
+        (a replayed or retried package).
+        """
+        url = f"{self.base_url}/alfresco/api/-default-/public/alfresco/versions/1/nodes/{parent_id}/children"
+
+        payload = {"name": name, "nodeType": "cm:folder"}
+        try:
+            data = await self._request(FOLDER, "POST", url, _json, json=payload)
+        except AlfrescoUploadError as e:
+            if e.status_code != 409:
+                raise
+            existing = await self.get_child(parent_id, name)
+            if existing is None or not existing.get("isFolder"):
+                raise
+            return existing["id"]
+
+        return data["entry"]["id"]
+
+    async def get_child(self, parent_id: str, name: str) -> Optional[dict]:
+        """
+        Entry of the child named ``name`` of a folder, None if absent.
+        """
+        url = f"{self.base_url}/alfresco/api/-default-/public/alfresco/versions/1/nodes/{parent_id}"
+
+        try:
+            data = await self._request(LIST, "GET", url, _json, params={"relativePath": name})
+        except AlfrescoUploadError as e:
+            if e.status_code == 404:
+                return None
+            raise
+
+        return data["entry"]
+
+    async def upload_file(self, parent_id: str, file_path: str, file_name: str) -> str:
+        """
+        Upload a local file; aiohttp streams it from disk in chunks.
+        The file is opened only once a request slot is held.
+        """
+        url = f"{self.base_url}/alfresco/api/-default-/public/alfresco/versions/1/nodes/{parent_id}/children"
+
+        @contextmanager
+        def form():
+            with open(file_path, "rb") as f:
+                data = aiohttp.FormData()
+                data.add_field("name", file_name)
+                data.add_field("nodeType", "cm:content")
+                data.add_field("overwrite", "true")
+                data.add_field(
+                    "filedata",
+                    f,
+                    filename=file_name,
+                    content_type="application/octet-stream",
+                )
+                yield data
+
+        data = await self._request(UPLOAD, "POST", url, _json, body=form)
+        return data["entry"]["id"]
+
+
+async def _json(r: aiohttp.ClientResponse):
+    return await r.json()
+
+
+async def _on_chunk_sent(session, context, params):
+    # Last call marks when the request body finished sending
+    context.trace_request_ctx.at = time.monotonic()
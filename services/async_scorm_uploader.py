@@ -0,0 +1,106 @@
+import asyncio
+import os
+from collections import defaultdict
+from typing import Awaitable, Callable, Dict, Iterable, List
+
+
+class AsyncScormUploader:
+    """
+    asyncio counterpart of ``ScormUploader``.
+
+    Folders are created level by level (siblings concurrently), then
+    files are uploaded concurrently by a bounded set of workers (one per
+    in-flight slot of the client). Files are opened inside the client's
+    slots, so the client's process-wide bound also caps open files
+    across all packages on the loop.
+    """
+
+    def __init__(self, alfresco_client):
+        self.client = alfresco_client
+
+    async def upload_directory(self, local_root: str, parent_node_id: str):
+        """
+        Uploads a directory tree to Alfresco.
+
+        :param local_root: Extracted SCORM root directory
+        :param parent_node_id: Alfresco folder node id
+        """
+        rel_dirs: List[str] = []
+        rel_files: List[str] = []
+
+        for root, dirs, files in os.walk(local_root):
+            rel_root = os.path.relpath(root, local_root)
+            rel_root = "" if rel_root == "." else rel_root
+
+            rel_dirs.extend(os.path.join(rel_root, d) for d in dirs)
+            rel_files.extend(os.path.join(rel_root, f) for f in files)
+
+        folder_map = await self.create_folder_tree(rel_dirs, parent_node_id)
+
+        await self._run_bounded(
+            lambda rel_path: self.client.upload_file(
+                parent_id=folder_map[os.path.dirname(rel_path)],
+                file_path=os.path.join(local_root, rel_path),
+                file_name=os.path.basename(rel_path),
+            ),
+            rel_files,
+        )
+
+    async def create_folder_tree(self, relative_dirs: Iterable[str], parent_node_id: str) -> Dict[str, str]:
+        """
+        Creates a folder skeleton in Alfresco.
+
+        :param relative_dirs: Relative folder paths ("a/b" implies "a")
+        :param parent_node_id: Alfresco folder node id of the tree root
+        :return: Mapping relative folder path -> node id ("" is the root)
+        """
+        folder_map: Dict[str, str] = {"": parent_node_id}
+
+        levels = defaultdict(set)
+        for rel_dir in relative_dirs:
+            while rel_dir:
+                levels[rel_dir.count(os.sep)].add(rel_dir)
+                rel_dir = os.path.dirname(rel_dir)
+
+        for depth in sorted(levels):
+            level = sorted(levels[depth])
+
+            node_ids = await self._run_bounded(
+                lambda rel_dir: self.client.create_folder(
+                    name=os.path.basename(rel_dir),
+                    parent_id=folder_map[os.path.dirname(rel_dir)],
+                ),
+                level,
+            )
+            folder_map.update(zip(level, node_ids))
+
+        return folder_map
+
+    async def _run_bounded(self, func: Callable[[str], Awaitable], items: List[str]) -> list:
+        """
+        Apply ``func`` to every item with at most ``client.max_in_flight``
+        calls active, bounding the coroutines a package creates. Results
+        come back in item order. On the first failure the other workers
+        are cancelled and the error re-raised.
+        """
+        results: list = [None] * len(items)
+        indices = iter(range(len(items)))
+
+        async def worker():
+            for i in indices:
+                results[i] = await func(items[i])
+
+        workers = [
+            asyncio.ensure_future(worker())
+            for _ in range(min(self.client.max_in_flight, len(items)))
+        ]
+
+        try:
+            await asyncio.gather(*workers)
+        except BaseException:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            raise
+
+        return results
@@ -0,0 +1,86 @@
+import logging
+import os
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+STORE_PROTOCOL = "store://"
+
+
+class HttpContentSource:
+    """
+    Fetches node content by downloading it through the Alfresco REST API.
+    """
+
+    def __init__(self, alfresco_client):
+        self.client = alfresco_client
+
+    def fetch(self, node_id: str, content_url: Optional[str], scratch_path: str) -> str:
+        """
+        Make a node's binary available as a local file.
+
+        :param content_url: Contentstore URL of the binary, if known
+        :param scratch_path: Where to write the file if a copy is needed
+        :return: Path of a readable file (treat it as read-only)
+        """
+        self.client.download_content(node_id, scratch_path)
+        return scratch_path
+
+
+class LocalContentStoreSource:
+    """
+    Reads node content in place from a locally mounted Alfresco
+    contentstore (``store://2024/5/17/9/30/<uuid>.bin`` resolves to
+    ``<root>/2024/5/17/9/30/<uuid>.bin``), with no network transfer and
+    no copy.
+
+    Content URLs that cannot be resolved (missing, another store
+    protocol, file absent from the mount or unreadable) go to
+    ``fallback``.
+    Any directory laid out like a contentstore works as ``root``.
+    """
+
+    def __init__(self, root: str, fallback=None):
+        self.root = os.path.realpath(root)
+        self.fallback = fallback
+
+    def resolve(self, content_url: Optional[str]) -> Optional[str]:
+        """
+        Map a content URL to a file under the store root.
+
+        :return: Absolute path, or None if the URL cannot be served locally
+        """
+        if not content_url or not content_url.startswith(STORE_PROTOCOL):
+            return None
+
+        relative = content_url[len(STORE_PROTOCOL):].lstrip("/")
+        path = os.path.realpath(os.path.join(self.root, relative))
+
+        if os.path.commonpath([self.root, path]) != self.root:
+            logger.warning("Content URL escapes the contentstore", extra={"content_url": content_url})
+            return None
+
+        if not os.path.isfile(path) or not os.access(path, os.R_OK):
+            return None
+
+        return path
+
+    def fetch(self, node_id: str, content_url: Optional[str], scratch_path: str) -> str:
+        """
+        Same contract as ``HttpContentSource.fetch``; the returned path
+        points into the (read-only) store when resolved locally.
+        """
+        path = self.resolve(content_url)
+        if path is not None:
+            return path
+
+        if self.fallback is None:
+            raise FileNotFoundError(
+                f"Content of node {node_id} not in contentstore: {content_url}"
+            )
+
+        logger.info(
+            "Content not in local contentstore, falling back",
+            extra={"node_id": node_id, "content_url": content_url},
+        )
+        return self.fallback.fetch(node_id, content_url, scratch_path)
@@ -2,13 +2,18 @@
 Central exception definitions for SCORM processing
 """
 
+import zipfile
+
+import pydantic
+import requests
+
 
 class ScormProcessingError(Exception):
     """
     Base exception for all SCORM-related errors.
     Catch this if you want to handle all SCORM failures generically.
     """
-    pass
+    permanent = False
 
 
 class ScormValidationError(ScormProcessingError):
@@ -16,6 +21,8 @@ class ScormValidationError(ScormProcessingError):
     Raised when ZIP or imsmanifest.xml validation fails.
     This is a permanent failure (should usually go to DLQ).
     """
+    permanent = True
+
     def __init__(self, errors):
         message = f"SCORM validation failed: {errors}"
         super().__init__(message)
@@ -27,10 +34,41 @@ class UnsafeZipError(ScormProcessingError):
     Raised when ZIP contains unsafe paths (zip-slip attack).
     Permanent failure.
     """
-    pass
+    permanent = True
 
 
-class AlfrescoDownloadError(ScormProcessingError):
+class InvalidEventError(ScormProcessingError, ValueError):
+    """
+    Raised when an event lacks or carries a malformed nodeRef.
+    Permanent failure.
+    """
+    permanent = True
+
+
+# Client errors a retry cannot fix (bad request, payload too large /
+# unsupported). 401/403/404/408/429 stay transient: they depend on
+# credentials, timing or load, not on the package. 409 (name conflict)
+# too: existing target folders are reused and existing files
+# overwritten, so a conflict left is a race a retry resolves.
+PERMANENT_HTTP_STATUSES = frozenset({400, 413, 415, 422})
+
+
+class AlfrescoRequestError(ScormProcessingError):
+    """
+    Raised by the async Alfresco client on an error response.
+    Permanent only for statuses in ``PERMANENT_HTTP_STATUSES``.
+    """
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.permanent = status_code in PERMANENT_HTTP_STATUSES
+
+    def __reduce__(self):
+        return type(self), (self.args[0], self.status_code)
+
+
+class AlfrescoDownloadError(AlfrescoRequestError):
     """
     Raised when content download from Alfresco fails.
     Transient in most cases (retryable).
@@ -38,9 +76,28 @@ class AlfrescoDownloadError(ScormProcessingError):
     pass
 
 
-class AlfrescoUploadError(ScormProcessingError):
+class AlfrescoUploadError(AlfrescoRequestError):
     """
     Raised when upload to Alfresco fails.
     Usually retryable.
     """
     pass
+
+
+def is_permanent(exc: BaseException) -> bool:
+    """
+    Classify an exception as permanent (never retry, dead-letter) or
+    transient (retry / redeliver).
+    """
+    if isinstance(exc, ScormProcessingError):
+        return exc.permanent
+
+    if isinstance(exc, requests.HTTPError):
+        return (
+            exc.response is not None
+            and exc.response.status_code in PERMANENT_HTTP_STATUSES
+        )
+
+    # Corrupt archives and events failing the schema. Other ValueErrors
+    # (e.g. an unparsable Alfresco response) stay transient.
+    return isinstance(exc, (zipfile.BadZipFile, pydantic.ValidationError))
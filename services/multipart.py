@@ -0,0 +1,124 @@
+import os
+import time
+import uuid
+from typing import BinaryIO, Dict, Iterator, Optional, Union
+
+
+class MultipartStream:
+    """
+    Streaming multipart/form-data body for ``requests``.
+
+    Unlike ``requests.post(files=...)``, which renders the whole body in
+    memory, this reads the file part from its source on demand, so memory
+    per upload is bounded by the chunk size.
+
+    - Known size (paths, zip members): sent with Content-Length
+      (``requests`` reads the body through ``read``)
+    - Unknown size: sent with chunked transfer encoding
+      (``requests`` iterates the body)
+
+    ``sent_at`` is the monotonic time the last byte was handed to the
+    transport, so callers can time the server's response separately
+    from the upload itself.
+    """
+
+    def __init__(
+        self,
+        fields: Dict[str, str],
+        file_field: str,
+        file_name: str,
+        source: Union[str, BinaryIO],
+        size: Optional[int] = None,
+        content_type: str = "application/octet-stream",
+        chunk_size: int = 1024 * 1024,
+    ):
+        """
+        :param fields: Plain form fields sent before the file
+        :param file_field: Form field name of the file part
+        :param file_name: File name announced for the file part
+        :param source: File path or open binary stream (e.g. zip member)
+        :param size: Source size in bytes, if known (derived for paths)
+        :param chunk_size: Max bytes read from the source at once
+        """
+        self.boundary = uuid.uuid4().hex
+        self.chunk_size = chunk_size
+
+        if isinstance(source, str):
+            size = os.path.getsize(source)
+            self._source = open(source, "rb")
+            self._owns_source = True
+        else:
+            self._source = source
+            self._owns_source = False
+
+        head = b"".join(
+            self._part_header(name, None, None) + value.encode("utf-8") + b"\r\n"
+            for name, value in fields.items()
+        )
+        head += self._part_header(file_field, file_name, content_type)
+        tail = f"\r\n--{self.boundary}--\r\n".encode("ascii")
+
+        self._head = head
+        self._tail = tail
+        self._stage = 0  # 0 = head, 1 = source, 2 = tail, 3 = done
+        self.sent_at: Optional[float] = None
+
+        if size is not None:
+            # Picked up by requests' super_len() -> Content-Length
+            self.len = len(head) + size + len(tail)
+
+    @property
+    def content_type(self) -> str:
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    def _part_header(self, name: str, file_name: Optional[str], content_type: Optional[str]) -> bytes:
+        disposition = f'form-data; name="{name}"'
+        if file_name is not None:
+            escaped = file_name.replace("\\", "\\\\").replace('"', '\\"')
+            disposition += f'; filename="{escaped}"'
+
+        header = f"--{self.boundary}\r\nContent-Disposition: {disposition}\r\n"
+        if content_type:
+            header += f"Content-Type: {content_type}\r\n"
+        return (header + "\r\n").encode("utf-8")
+
+    def read(self, size: int = -1) -> bytes:
+        """
+        Read up to ``size`` bytes of the body (``chunk_size`` if negative).
+        """
+        if size is None or size < 0:
+            size = self.chunk_size
+
+        out = []
+        while size > 0 and self._stage < 3:
+            if self._stage == 0:
+                chunk, self._head = self._head[:size], self._head[size:]
+                if not self._head:
+                    self._stage = 1
+            elif self._stage == 1:
+                chunk = self._source.read(min(size, self.chunk_size))
+                if not chunk:
+                    self.close()
+                    self._stage = 2
+                    continue
+            else:
+                chunk, self._tail = self._tail[:size], self._tail[size:]
+                if not self._tail:
+                    self._stage = 3
+                    self.sent_at = time.monotonic()
+
+            out.append(chunk)
+            size -= len(chunk)
+
+        return b"".join(out)
+
+    def __iter__(self) -> Iterator[bytes]:
+        while True:
+            chunk = self.read(self.chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+    def close(self) -> None:
+        if self._owns_source and not self._source.closed:
+            self._source.close()
@@ -0,0 +1,296 @@
+"""
+services.request_governor
+=========================
+
+Cluster-wide request governor for Alfresco API calls.
+
+Every worker shares one token bucket per request class (upload,
+folder creation, download, listing) stored in Redis, so the total request
+rate against the repository stays bounded no matter how many
+Celery workers are running.
+
+The refill rate of each bucket adapts to repository health (AIMD):
+- 429 / 503 responses, slow responses, connection errors and
+  timeouts cut the rate multiplicatively
+- healthy responses ramp it back up additively towards the maximum
+
+A ``Retry-After`` on a throttled response also pauses the bucket
+(no tokens for every worker) for that long.
+
+Both the bucket and the adaptation run as Lua scripts using the Redis
+server clock, so they are atomic and immune to worker clock skew.
+"""
+
+import logging
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+UPLOAD = "upload"
+FOLDER = "folder"
+DOWNLOAD = "download"
+LIST = "list"
+
+# Returns 0 when a token was taken, otherwise the wait time in ms.
+_ACQUIRE_LUA = """
+local key = KEYS[1]
+local max_rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+
+local state = redis.call('HMGET', key, 'tokens', 'ts', 'rate', 'hold')
+
+-- Paused by a Retry-After
+local hold = tonumber(state[4]) or 0
+if now < hold then
+    return math.ceil((hold - now) * 1000)
+end
+
+local rate = math.min(tonumber(state[3]) or max_rate, max_rate)
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+
+tokens = math.min(burst, tokens + (now - ts) * rate)
+
+local wait_ms = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait_ms = math.ceil((1 - tokens) / rate * 1000)
+end
+
+redis.call('HSET', key, 'tokens', tokens, 'ts', now, 'rate', rate)
+redis.call('EXPIRE', key, 3600)
+return wait_ms
+"""
+
+# Adjusts the shared refill rate. ARGV[1] is 1 for a throttle signal,
+# 0 for a healthy response. ARGV[7] > 0 pauses the bucket that many
+# seconds (Retry-After).
+_FEEDBACK_LUA = """
+local key = KEYS[1]
+local throttled = tonumber(ARGV[1]) == 1
+local max_rate = tonumber(ARGV[2])
+local min_rate = tonumber(ARGV[3])
+local backoff = tonumber(ARGV[4])
+local step = tonumber(ARGV[5])
+local cooldown = tonumber(ARGV[6])
+local retry_after = tonumber(ARGV[7])
+
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+
+local state = redis.call('HMGET', key, 'rate', 'cut_ts', 'hold')
+local rate = math.min(tonumber(state[1]) or max_rate, max_rate)
+local cut_ts = tonumber(state[2]) or 0
+
+if retry_after > 0 then
+    redis.call('HSET', key, 'hold', math.max(tonumber(state[3]) or 0, now + retry_after))
+end
+
+if throttled then
+    -- One cut per cooldown window: a burst of concurrent 503s is a
+    -- single congestion signal, not many.
+    if now - cut_ts >= cooldown then
+        rate = math.max(min_rate, rate * backoff)
+        redis.call('HSET', key, 'rate', rate, 'cut_ts', now)
+    end
+else
+    rate = math.min(max_rate, rate + step)
+    redis.call('HSET', key, 'rate', rate)
+end
+
+redis.call('EXPIRE', key, 3600)
+return tostring(rate)
+"""
+
+
+@dataclass(frozen=True)
+class RequestBudget:
+    """
+    Rate budget for one request class.
+
+    Attributes
+    ----------
+    max_rate : float
+        Cluster-wide ceiling in requests per second.
+    burst : float
+        Bucket capacity (requests that may be issued back-to-back).
+    """
+    max_rate: float
+    burst: float
+
+
+class AlfrescoRequestGovernor:
+    """
+    Redis-backed adaptive token bucket shared by all workers.
+
+    Parameters
+    ----------
+    redis_client : redis.Redis
+        Client used for the shared bucket state.
+    budgets : Dict[str, RequestBudget]
+        Budget per request class (UPLOAD, FOLDER, DOWNLOAD, LIST).
+    latency_threshold : float
+        Response time (seconds) above which a call counts as a
+        congestion signal.
+    backoff_factor : float
+        Multiplier applied to the rate on congestion.
+    recovery_step : float
+        Fraction of ``max_rate`` added back per healthy response.
+    min_rate_fraction : float
+        Floor for the rate, as a fraction of ``max_rate``.
+    cooldown : float
+        Minimum seconds between two consecutive rate cuts.
+    key_prefix : str
+        Redis key prefix.
+    """
+
+    THROTTLE_STATUSES = frozenset({429, 503})
+    # Upper bound on a honoured Retry-After (seconds)
+    MAX_RETRY_AFTER = 300.0
+
+    def __init__(
+        self,
+        redis_client,
+        budgets: Dict[str, RequestBudget],
+        latency_threshold: float = 5.0,
+        backoff_factor: float = 0.5,
+        recovery_step: float = 0.02,
+        min_rate_fraction: float = 0.05,
+        cooldown: float = 1.0,
+        key_prefix: str = "alfresco:governor",
+    ):
+        self.redis = redis_client
+        self.budgets = budgets
+        self.latency_threshold = latency_threshold
+        self.backoff_factor = backoff_factor
+        self.recovery_step = recovery_step
+        self.min_rate_fraction = min_rate_fraction
+        self.cooldown = cooldown
+        self.key_prefix = key_prefix
+
+        self._acquire = redis_client.register_script(_ACQUIRE_LUA)
+        self._feedback = redis_client.register_script(_FEEDBACK_LUA)
+
+    def _key(self, kind: str) -> str:
+        return f"{self.key_prefix}:{kind}"
+
+    def try_acquire(self, kind: str) -> float:
+        """
+        Try to take a token without blocking.
+
+        Returns
+        -------
+        float
+            0 when a token was taken, otherwise the seconds to wait
+            before trying again. Classes without a budget are not limited.
+        """
+        budget = self.budgets.get(kind)
+        if budget is None:
+            return 0.0
+
+        wait_ms = int(
+            self._acquire(
+                keys=[self._key(kind)],
+                args=[budget.max_rate, budget.burst],
+            )
+        )
+        return max(wait_ms, 0) / 1000
+
+    def acquire(self, kind: str) -> None:
+        """
+        Block until a request of the given class may be issued.
+        """
+        while True:
+            wait = self.try_acquire(kind)
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    def record(
+        self,
+        kind: str,
+        status_code: Optional[int],
+        elapsed: float,
+        retry_after: Optional[float] = None,
+    ) -> None:
+        """
+        Feed the outcome of a request back into the shared rate.
+
+        Parameters
+        ----------
+        kind : str
+            Request class.
+        status_code : int or None
+            HTTP status of the response, None when the request failed
+            without one (connection error, timeout).
+        elapsed : float
+            Time from the end of the request body to the response
+            headers (seconds), so upload size does not count as latency.
+        retry_after : float, optional
+            Seconds from a ``Retry-After`` header of a throttled
+            response (see ``parse_retry_after``).
+        """
+        budget = self.budgets.get(kind)
+        if budget is None:
+            return
+
+        throttled = (
+            status_code is None
+            or status_code in self.THROTTLE_STATUSES
+            or elapsed > self.latency_threshold
+        )
+
+        pause = 0.0
+        if retry_after and status_code in self.THROTTLE_STATUSES:
+            pause = min(retry_after, self.MAX_RETRY_AFTER)
+
+        rate = self._feedback(
+            keys=[self._key(kind)],
+            args=[
+                1 if throttled else 0,
+                budget.max_rate,
+                budget.max_rate * self.min_rate_fraction,
+                self.backoff_factor,
+                budget.max_rate * self.recovery_step,
+                self.cooldown,
+                pause,
+            ],
+        )
+
+        if throttled:
+            logger.warning(
+                "Alfresco congestion signal",
+                extra={
+                    "kind": kind,
+                    "status": status_code,
+                    "elapsed": round(elapsed, 3),
+                    "retry_after": pause,
+                    "rate": rate,
+                },
+            )
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Seconds to wait from a ``Retry-After`` header value (delay in
+    seconds or HTTP date), None when absent or unparsable.
+    """
+    if not value:
+        return None
+
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
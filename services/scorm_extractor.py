@@ -1,22 +1,50 @@
 import zipfile
 import os
+import shutil
+from typing import Iterable, Optional
 from services.exceptions import UnsafeZipError
 
 
 class ScormExtractor:
-    def extract(self, zip_path: str, target_dir: str):
+    COPY_CHUNK_SIZE = 1024 * 1024
+
+    def extract(self, zip_path: str, target_dir: str, members: Optional[Iterable[str]] = None):
+        """
+        Extract a ZIP safely.
+
+        :param members: Optional subset of member names to extract
+                        (defaults to the whole archive)
+        """
         with zipfile.ZipFile(zip_path) as zf:
-            for m in zf.infolist():
+            infos = (
+                zf.infolist()
+                if members is None
+                else [zf.getinfo(name) for name in members]
+            )
+            for m in infos:
                 self._safe_extract(zf, m, target_dir)
 
-    def _safe_extract(self, zf, member, target_dir):
-        normalized = os.path.normpath(member.filename)
+    def safe_path(self, name: str) -> str:
+        """
+        Normalize a member name, rejecting zip-slip paths.
+        """
+        normalized = os.path.normpath(name)
 
         if normalized.startswith("..") or os.path.isabs(normalized):
-            raise UnsafeZipError(f"Unsafe ZIP entry: {member.filename}")
+            raise UnsafeZipError(f"Unsafe ZIP entry: {name}")
+
+        return normalized
+
+    def _safe_extract(self, zf, member, target_dir):
+        normalized = self.safe_path(member.filename)
 
         dest = os.path.join(target_dir, normalized)
+
+        if member.is_dir():
+            os.makedirs(dest, exist_ok=True)
+            return
+
         os.makedirs(os.path.dirname(dest), exist_ok=True)
 
         with zf.open(member) as src, open(dest, "wb") as dst:
-            dst.write(src.read())
+            shutil.copyfileobj(src, dst, self.COPY_CHUNK_SIZE)
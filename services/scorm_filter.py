@@ -0,0 +1,144 @@
+import fnmatch
+import posixpath
+import zipfile
+import xml.etree.ElementTree as ET
+from typing import Iterable, List, Optional, Set
+from urllib.parse import unquote, urlsplit
+from pydantic import BaseModel, Field
+
+
+XML_BASE = "{http://www.w3.org/XML/1998/namespace}base"
+
+
+class ScormFilterResult(BaseModel):
+    kept: List[str] = Field(default_factory=list)
+    kept_bytes: int = 0
+    dropped_files: int = 0
+    dropped_bytes: int = 0
+
+
+class ScormFileFilter:
+    """
+    Selects which ZIP members of a SCORM package get uploaded.
+
+    - Deny globs are matched against the full member path and against
+      each of its path components ("__MACOSX" drops the whole folder,
+      "*.psd" drops every Photoshop file).
+    - Strict mode keeps only files of resources reachable from the
+      manifest (resources referenced by organization items, followed
+      through <dependency> links), plus the manifest itself and schema
+      files next to it.
+    """
+
+    MANIFEST = "imsmanifest.xml"
+    SCHEMA_SUFFIXES = (".xsd", ".dtd")
+
+    def __init__(self, deny_globs: Iterable[str] = (), strict_manifest: bool = False):
+        self.deny_globs = list(deny_globs)
+        self.strict_manifest = strict_manifest
+
+    def apply(self, zip_path: str) -> ScormFilterResult:
+        result = ScormFilterResult()
+
+        with zipfile.ZipFile(zip_path) as zf:
+            files = [m for m in zf.infolist() if not m.is_dir()]
+            manifest = self._find_manifest(m.filename for m in files)
+            reachable = (
+                self._manifest_files(zf, manifest)
+                if self.strict_manifest and manifest
+                else None
+            )
+
+        for m in files:
+            path = posixpath.normpath(m.filename)
+
+            keep = m.filename == manifest or (
+                not self._denied(path)
+                and (reachable is None or path in reachable)
+            )
+
+            if keep:
+                result.kept.append(m.filename)
+                result.kept_bytes += m.file_size
+            else:
+                result.dropped_files += 1
+                result.dropped_bytes += m.file_size
+
+        return result
+
+    def _denied(self, path: str) -> bool:
+        candidates = [path, *path.split("/")]
+        return any(
+            fnmatch.fnmatchcase(c, pattern)
+            for pattern in self.deny_globs
+            for c in candidates
+        )
+
+    def _find_manifest(self, names: Iterable[str]) -> Optional[str]:
+        matches = [n for n in names if n.lower().endswith(self.MANIFEST)]
+        return min(matches, key=len) if matches else None
+
+    def _manifest_files(self, zf, manifest: str) -> Set[str]:
+        base = posixpath.dirname(manifest)
+        root = ET.fromstring(zf.read(manifest))
+        ns = self._ns(root)
+
+        reachable: Set[str] = set()
+
+        for name in zf.namelist():
+            if posixpath.dirname(name) == base and name.lower().endswith(self.SCHEMA_SUFFIXES):
+                reachable.add(posixpath.normpath(name))
+
+        resources = root.find(f"{ns}resources")
+        if resources is None:
+            return reachable
+
+        resources_base = posixpath.join(base, resources.get(XML_BASE, ""))
+        by_id = {
+            r.get("identifier"): r for r in resources.findall(f"{ns}resource")
+        }
+
+        # Launchable resources are the ones organization items point at;
+        # everything else must be reached through <dependency> links.
+        pending = [
+            item.get("identifierref")
+            for item in root.iter(f"{ns}item")
+            if item.get("identifierref") in by_id
+        ] or list(by_id)
+        seen: Set[str] = set()
+
+        while pending:
+            identifier = pending.pop()
+            if identifier in seen or identifier not in by_id:
+                continue
+            seen.add(identifier)
+
+            resource = by_id[identifier]
+            resource_base = posixpath.join(resources_base, resource.get(XML_BASE, ""))
+
+            hrefs = [resource.get("href")]
+            hrefs += [f.get("href") for f in resource.findall(f"{ns}file")]
+
+            for href in hrefs:
+                path = self._resolve(resource_base, href)
+                if path:
+                    reachable.add(path)
+
+            pending += [
+                d.get("identifierref") for d in resource.findall(f"{ns}dependency")
+            ]
+
+        return reachable
+
+    def _resolve(self, base: str, href: Optional[str]) -> Optional[str]:
+        if not href:
+            return None
+
+        parts = urlsplit(href)
+        if parts.scheme or parts.netloc:
+            return None
+
+        return posixpath.normpath(posixpath.join(base, unquote(parts.path)))
+
+    def _ns(self, root):
+        return root.tag.split("}")[0] + "}" if root.tag.startswith("{") else ""
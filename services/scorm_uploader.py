@@ -1,5 +1,5 @@
 import os
-from typing import Dict
+from typing import Callable, Dict, Iterable, Optional
 
 
 class ScormUploader:
@@ -41,3 +41,60 @@ class ScormUploader:
                     file_path=file_path,
                     file_name=filename,
                 )
+
+    def create_folder_tree(self, relative_dirs: Iterable[str], parent_node_id: str) -> Dict[str, str]:
+        """
+        Creates a folder skeleton in Alfresco.
+
+        :param relative_dirs: Relative folder paths ("a/b" implies "a")
+        :param parent_node_id: Alfresco folder node id of the tree root
+        :return: Mapping relative folder path -> node id ("" is the root)
+        """
+        folder_map: Dict[str, str] = {"": parent_node_id}
+
+        all_dirs = set()
+        for rel_dir in relative_dirs:
+            while rel_dir:
+                all_dirs.add(rel_dir)
+                rel_dir = os.path.dirname(rel_dir)
+
+        for rel_dir in sorted(all_dirs, key=lambda d: d.count("/")):
+            parent, name = os.path.split(rel_dir)
+
+            folder_map[rel_dir] = self.client.create_folder(
+                name=name,
+                parent_id=folder_map[parent],
+            )
+
+        return folder_map
+
+    def upload_zip_members(
+        self,
+        zf,
+        members: Dict[str, str],
+        folder_map: Dict[str, str],
+        on_uploaded: Optional[Callable[[str], None]] = None,
+    ):
+        """
+        Streams ZIP members straight into an existing folder skeleton,
+        without extracting them to disk.
+
+        :param zf: Open zipfile.ZipFile
+        :param members: Mapping member name -> safe relative path
+        :param folder_map: Output of ``create_folder_tree``
+        :param on_uploaded: Called with each member name once uploaded
+        """
+        for name, rel_path in members.items():
+            parent, filename = os.path.split(rel_path)
+            info = zf.getinfo(name)
+
+            with zf.open(info) as stream:
+                self.client.upload_file(
+                    parent_id=folder_map[parent],
+                    file_path=stream,
+                    file_name=filename,
+                    size=info.file_size,
+                )
+
+            if on_uploaded is not None:
+                on_uploaded(name)
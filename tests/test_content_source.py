@@ -0,0 +1,102 @@
+import os
+
+import pytest
+
+from services.content_source import LocalContentStoreSource
+
+CONTENT_URL = "store://2024/5/17/9/30/0b8e2c6a.bin"
+
+
+class RecordingFallback:
+    """
+    Stands in for ``HttpContentSource``: records calls, writes a file.
+    """
+
+    def __init__(self):
+        self.calls = []
+
+    def fetch(self, node_id, content_url, scratch_path):
+        self.calls.append((node_id, content_url))
+        with open(scratch_path, "wb") as f:
+            f.write(b"downloaded")
+        return scratch_path
+
+
+@pytest.fixture
+def store(tmp_path):
+    root = tmp_path / "contentstore"
+    binary = root / "2024" / "5" / "17" / "9" / "30" / "0b8e2c6a.bin"
+    binary.parent.mkdir(parents=True)
+    binary.write_bytes(b"PK\x05\x06" + b"\x00" * 18)
+    (tmp_path / "outside.bin").write_bytes(b"secret")
+    return root
+
+
+@pytest.fixture
+def fallback():
+    return RecordingFallback()
+
+
+def test_resolve_maps_store_url_under_root(store):
+    source = LocalContentStoreSource(str(store))
+
+    path = source.resolve(CONTENT_URL)
+
+    assert path == os.path.realpath(store / "2024/5/17/9/30/0b8e2c6a.bin")
+
+
+@pytest.mark.parametrize(
+    "content_url",
+    [
+        None,
+        "",
+        "s3://bucket/2024/5/17/9/30/0b8e2c6a.bin",
+        "store://2024/5/17/9/30/missing.bin",
+        "store://2024/5/17",
+        "store://../outside.bin",
+    ],
+)
+def test_resolve_rejects_unservable_urls(store, content_url):
+    assert LocalContentStoreSource(str(store)).resolve(content_url) is None
+
+
+def test_fetch_reads_in_place(store, fallback, tmp_path):
+    source = LocalContentStoreSource(str(store), fallback)
+    scratch = tmp_path / "scratch.zip"
+
+    path = source.fetch("node-1", CONTENT_URL, str(scratch))
+
+    assert path == source.resolve(CONTENT_URL)
+    assert not scratch.exists()
+    assert fallback.calls == []
+
+
+def test_fetch_falls_back_when_file_missing(store, fallback, tmp_path):
+    source = LocalContentStoreSource(str(store), fallback)
+    scratch = tmp_path / "scratch.zip"
+    missing = "store://2024/5/17/9/30/missing.bin"
+
+    path = source.fetch("node-1", missing, str(scratch))
+
+    assert path == str(scratch)
+    assert scratch.read_bytes() == b"downloaded"
+    assert fallback.calls == [("node-1", missing)]
+
+
+def test_fetch_falls_back_when_file_unreadable(store, fallback, tmp_path, monkeypatch):
+    # chmod is not enough when the suite runs as root
+    monkeypatch.setattr(os, "access", lambda path, mode: False)
+    source = LocalContentStoreSource(str(store), fallback)
+    scratch = tmp_path / "scratch.zip"
+
+    path = source.fetch("node-1", CONTENT_URL, str(scratch))
+
+    assert path == str(scratch)
+    assert fallback.calls == [("node-1", CONTENT_URL)]
+
+
+def test_fetch_without_fallback_raises(store, tmp_path):
+    source = LocalContentStoreSource(str(store))
+
+    with pytest.raises(FileNotFoundError):
+        source.fetch("node-1", "store://2024/5/17/9/30/missing.bin", str(tmp_path / "x"))
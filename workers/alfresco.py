@@ -0,0 +1,157 @@
+"""
+workers.alfresco
+================
+
+Worker-side construction of Alfresco clients and content sources
+(also used by the backfill CLI).
+
+Clients built here (blocking, or asyncio for the async execution
+mode) are wired to the cluster-wide request governor so that every
+Alfresco call made by any worker draws from the same Redis-backed
+budgets.
+"""
+
+from typing import Optional
+
+import redis
+
+from core import tunables
+from core.settings import settings
+from services.alfresco_client import AlfrescoClient
+from services.content_source import HttpContentSource, LocalContentStoreSource
+from services.request_governor import (
+    DOWNLOAD,
+    FOLDER,
+    LIST,
+    UPLOAD,
+    AlfrescoRequestGovernor,
+    RequestBudget,
+)
+
+_redis = redis.Redis(
+    host=settings.REDIS_HOST,
+    port=settings.REDIS_PORT,
+    db=3,
+)
+
+
+def build_governor() -> AlfrescoRequestGovernor:
+    """
+    Build the shared request governor from current settings.
+
+    Rates are live tunables, read on every build (once per task).
+
+    Returns
+    -------
+    AlfrescoRequestGovernor
+        Governor with one budget per Alfresco request class.
+    """
+    values = tunables.get()
+
+    budgets = {
+        UPLOAD: RequestBudget(
+            max_rate=values.ALFRESCO_UPLOAD_RATE,
+            burst=values.ALFRESCO_UPLOAD_RATE,
+        ),
+        FOLDER: RequestBudget(
+            max_rate=values.ALFRESCO_FOLDER_RATE,
+            burst=values.ALFRESCO_FOLDER_RATE,
+        ),
+        DOWNLOAD: RequestBudget(
+            max_rate=values.ALFRESCO_DOWNLOAD_RATE,
+            burst=values.ALFRESCO_DOWNLOAD_RATE,
+        ),
+        LIST: RequestBudget(
+            max_rate=values.ALFRESCO_LIST_RATE,
+            burst=values.ALFRESCO_LIST_RATE,
+        ),
+    }
+
+    return AlfrescoRequestGovernor(
+        _redis,
+        budgets,
+        latency_threshold=settings.ALFRESCO_GOVERNOR_LATENCY_THRESHOLD,
+        backoff_factor=settings.ALFRESCO_GOVERNOR_BACKOFF_FACTOR,
+        recovery_step=settings.ALFRESCO_GOVERNOR_RECOVERY_STEP,
+        min_rate_fraction=settings.ALFRESCO_GOVERNOR_MIN_RATE_FRACTION,
+    )
+
+
+def build_alfresco_client() -> AlfrescoClient:
+    """
+    Build an Alfresco client for worker tasks.
+
+    Returns
+    -------
+    AlfrescoClient
+        Client governed by shared budgets unless the governor is
+        disabled via ``ALFRESCO_GOVERNOR_ENABLED``.
+    """
+    governor = build_governor() if settings.ALFRESCO_GOVERNOR_ENABLED else None
+
+    return AlfrescoClient(
+        settings.ALFRESCO_BASE_URL,
+        settings.ALFRESCO_USERNAME,
+        settings.ALFRESCO_PASSWORD,
+        governor=governor,
+        upload_chunk_size=settings.ALFRESCO_UPLOAD_CHUNK_SIZE,
+    )
+
+
+def build_contentstore(fallback=None) -> Optional[LocalContentStoreSource]:
+    """
+    Build the local contentstore reader, if a mount is configured.
+
+    Parameters
+    ----------
+    fallback : optional
+        Content source used for binaries the mount cannot serve.
+
+    Returns
+    -------
+    LocalContentStoreSource or None
+        None unless ``CONTENTSTORE_ROOT`` is set.
+    """
+    if not settings.CONTENTSTORE_ROOT:
+        return None
+
+    return LocalContentStoreSource(settings.CONTENTSTORE_ROOT, fallback=fallback)
+
+
+def build_content_source(client: AlfrescoClient):
+    """
+    Build the content source for worker tasks.
+
+    Returns
+    -------
+    LocalContentStoreSource or HttpContentSource
+        In-place contentstore reads with HTTP fallback when
+        ``CONTENTSTORE_ROOT`` is set, plain HTTP download otherwise.
+    """
+    http = HttpContentSource(client)
+    return build_contentstore(fallback=http) or http
+
+
+def build_async_alfresco_client():
+    """
+    Build the async Alfresco client used by the async execution mode.
+
+    Returns
+    -------
+    AsyncAlfrescoClient
+        Client bounded by ``ASYNC_MAX_IN_FLIGHT_REQUESTS`` and governed
+        like ``build_alfresco_client``. Build it on the event loop that
+        will use it.
+    """
+    from services.async_alfresco_client import AsyncAlfrescoClient
+
+    governor = build_governor() if settings.ALFRESCO_GOVERNOR_ENABLED else None
+
+    return AsyncAlfrescoClient(
+        settings.ALFRESCO_BASE_URL,
+        settings.ALFRESCO_USERNAME,
+        settings.ALFRESCO_PASSWORD,
+        max_in_flight=tunables.get().ASYNC_MAX_IN_FLIGHT_REQUESTS,
+        governor=governor,
+        download_chunk_size=settings.ALFRESCO_UPLOAD_CHUNK_SIZE,
+    )
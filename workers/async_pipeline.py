@@ -0,0 +1,89 @@
+"""
+workers.async_pipeline
+======================
+
+asyncio implementation of the package pipeline
+(``WORKER_EXECUTION_MODE=async``).
+
+Network steps (download, folder creation, uploads) run on the shared
+process loop (see ``workers.async_runtime``), so a single worker
+process keeps many uploads in flight across packages. CPU and disk
+bound steps (validation, filtering, extraction) run in the loop's
+default thread pool.
+
+Large packages are uploaded in-process rather than fanned out: with
+hundreds of requests in flight per process, sharding them over
+other workers gains little.
+"""
+
+import asyncio
+import os
+import tempfile
+from typing import Optional
+
+from core.tracing import current_span
+from services.async_scorm_uploader import AsyncScormUploader
+from services.exceptions import AlfrescoDownloadError
+from services.scorm_extractor import ScormExtractor
+from workers.alfresco import build_contentstore
+from workers.async_runtime import get_client
+from workers.pipeline import select_files, stage
+
+
+async def process_package(
+    zip_node_id: str,
+    parent_node_id: str,
+    zip_name: str,
+    content_url: Optional[str] = None,
+) -> bool:
+    """
+    Download (or read in place from the contentstore), validate,
+    filter, extract and upload one package.
+    """
+    client = get_client()
+    uploader = AsyncScormUploader(client)
+    target_folder_name = os.path.splitext(zip_name)[0]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        zip_path = os.path.join(tmp, zip_name)
+        extract_dir = os.path.join(tmp, "extracted")
+
+        contentstore = build_contentstore()
+        local_path = contentstore.resolve(content_url) if contentstore else None
+
+        span = current_span()
+        if span is not None:
+            span.set_attribute("content.in_place", local_path is not None)
+
+        try:
+            with stage("download"):
+                if local_path is not None:
+                    zip_path = local_path
+                else:
+                    await client.download_content(zip_node_id, zip_path)
+        except AlfrescoDownloadError as e:
+            if e.status_code == 404:
+                raise RuntimeError(
+                    f"Binary not yet available for node {zip_node_id}"
+                )
+            raise
+
+        selection = await asyncio.to_thread(select_files, zip_path, zip_node_id)
+
+        target_folder_id = await client.create_folder(
+            name=target_folder_name,
+            parent_id=parent_node_id,
+        )
+
+        with stage("extract"):
+            await asyncio.to_thread(
+                ScormExtractor().extract,
+                zip_path,
+                extract_dir,
+                members=selection.kept,
+            )
+
+        with stage("upload", {"files": len(selection.kept)}):
+            await uploader.upload_directory(extract_dir, target_folder_id)
+
+    return True
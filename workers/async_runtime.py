@@ -0,0 +1,106 @@
+"""
+workers.async_runtime
+=====================
+
+Per-process event loop for ``WORKER_EXECUTION_MODE=async``.
+
+Each worker process runs one asyncio loop in a daemon thread, with a
+single shared ``AsyncAlfrescoClient``. Task threads submit coroutines
+and block on their result, so all packages processed by a
+``--pool=threads`` worker share one connection pool and one bound on
+in-flight Alfresco requests (``ASYNC_MAX_IN_FLIGHT_REQUESTS``).
+
+The loop is created lazily, re-created after a fork, and the client
+session is closed at interpreter exit.
+"""
+
+import asyncio
+import atexit
+import concurrent.futures
+import contextvars
+import os
+import threading
+from typing import Any, Coroutine, Optional
+
+from core import tunables
+
+_lock = threading.Lock()
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_pid: Optional[int] = None
+_client = None
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    global _loop, _pid, _client
+
+    with _lock:
+        if _loop is None or _pid != os.getpid():
+            loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=loop.run_forever,
+                name="async-pipeline",
+                daemon=True,
+            ).start()
+            _loop, _pid, _client = loop, os.getpid(), None
+
+        return _loop
+
+
+def get_client():
+    """
+    Shared async Alfresco client of this process, with the current
+    ``ASYNC_MAX_IN_FLIGHT_REQUESTS`` tunable applied.
+
+    Must be called from coroutines running on the runtime loop.
+    """
+    global _client
+
+    if _client is None:
+        from workers.alfresco import build_async_alfresco_client
+
+        _client = build_async_alfresco_client()
+    else:
+        limit = tunables.get().ASYNC_MAX_IN_FLIGHT_REQUESTS
+        if limit != _client.max_in_flight:
+            _client.set_max_in_flight(limit)
+
+    return _client
+
+
+def run(coro: Coroutine) -> Any:
+    """
+    Run a coroutine on the process loop and wait for its result.
+
+    The coroutine runs in a copy of the caller's context, so the
+    active trace span and task profile carry over.
+    """
+    loop = _get_loop()
+    context = contextvars.copy_context()
+    future: concurrent.futures.Future = concurrent.futures.Future()
+
+    def _done(task: asyncio.Task) -> None:
+        if task.cancelled():
+            future.cancel()
+        elif task.exception() is not None:
+            future.set_exception(task.exception())
+        else:
+            future.set_result(task.result())
+
+    def _schedule() -> None:
+        loop.create_task(coro, context=context).add_done_callback(_done)
+
+    loop.call_soon_threadsafe(_schedule)
+
+    return future.result()
+
+
+@atexit.register
+def _shutdown() -> None:
+    loop, client = _loop, _client
+    if loop is None or client is None or _pid != os.getpid():
+        return
+
+    try:
+        asyncio.run_coroutine_threadsafe(client.close(), loop).result(timeout=5)
+    except Exception:
+        pass
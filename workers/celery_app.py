@@ -17,27 +17,22 @@ Design principles:
 
 from celery import Celery
 
+from core.celery_config import CELERY_APP_NAME, CELERY_CONF
 from core.settings import settings
+import workers.pool_tuning  # noqa: F401  (live pool resizing)
 
 # Celery application instance
 celery_app = Celery(
-    "alfresco_ai",
+    CELERY_APP_NAME,
     broker=settings.CELERY_BROKER_URL,
     backend=settings.CELERY_RESULT_BACKEND,
 )
 
-# Celery configuration
-celery_app.conf.update(
-    task_serializer="json",
-    accept_content=["json"],
-    result_serializer="json",
+# Celery configuration (shared with consumer.publisher)
+celery_app.conf.update(CELERY_CONF)
 
-    timezone="UTC",
-    enable_utc=True,
-
-    task_acks_late=True,
-    worker_prefetch_multiplier=1,
-)
+if settings.WORKER_CONCURRENCY:
+    celery_app.conf.worker_concurrency = settings.WORKER_CONCURRENCY
 
 # Task discovery
 celery_app.autodiscover_tasks(
@@ -0,0 +1,72 @@
+"""
+workers.negative_cache
+======================
+
+Redis-backed negative cache of permanently failed node versions.
+
+When a node version is rejected (invalid or unsafe package), the
+rejection is remembered so that redeliveries or duplicate events for
+the same version are rejected instantly, without downloading the
+binary again. A new version of the node gets a new key and is
+processed normally.
+"""
+
+import json
+import redis
+from typing import Any, Dict, Optional
+
+from core.settings import settings
+
+_redis = redis.Redis(
+    host=settings.REDIS_HOST,
+    port=settings.REDIS_PORT,
+    db=2,
+    decode_responses=True,
+)
+
+_PREFIX = "scorm:rejected"
+
+
+def cache_key(payload: dict) -> Optional[str]:
+    """
+    Key identifying a node version in a raw RepoEvent payload.
+
+    Falls back to modification time and size when the event carries no
+    version label. Returns None when the payload identifies no node
+    version: such events are neither cached nor looked up, since one
+    bad upload would otherwise reject every later version of the node.
+    """
+    node = payload.get("nodeRef")
+    version = payload.get("versionLabel")
+
+    if not version and payload.get("modifiedAt") and payload.get("size") is not None:
+        version = f"{payload['modifiedAt']}:{payload['size']}"
+
+    if not node or not version:
+        return None
+
+    return f"{_PREFIX}:{node}:{version}"
+
+
+def get_rejection(key: Optional[str]) -> Optional[Dict[str, Any]]:
+    """
+    Return the cached rejection of a node version, if any.
+    """
+    if not settings.NEGATIVE_CACHE_TTL or key is None:
+        return None
+
+    cached = _redis.get(key)
+    if cached is None:
+        return None
+
+    return {**json.loads(cached), "cached": True}
+
+
+def remember_rejection(key: Optional[str], rejection: Dict[str, Any]) -> None:
+    """
+    Cache a rejection for ``NEGATIVE_CACHE_TTL`` seconds.
+    """
+    if not settings.NEGATIVE_CACHE_TTL or key is None:
+        return
+
+    _redis.setex(key, settings.NEGATIVE_CACHE_TTL, json.dumps(rejection))
@@ -0,0 +1,68 @@
+"""
+workers.pipeline
+================
+
+Pipeline steps shared by the sync and async execution modes.
+"""
+
+import logging
+from contextlib import contextmanager
+
+from core.settings import settings
+from core.tracing import start_span
+from services.exceptions import ScormValidationError
+from services.scorm_filter import ScormFileFilter, ScormFilterResult
+from services.scorm_zip_detector import ScormZipDetector
+from workers.profiling import profile_stage
+
+logger = logging.getLogger(__name__)
+
+
+@contextmanager
+def stage(name: str, attributes=None):
+    """
+    Pipeline stage: traced, and profiled when the run is profiled.
+    """
+    with start_span(name, attributes), profile_stage(name):
+        yield
+
+
+def build_file_filter() -> ScormFileFilter:
+    """
+    Build the package file filter from current settings.
+    """
+    return ScormFileFilter(
+        settings.SCORM_FILTER_DENY_GLOBS,
+        strict_manifest=settings.SCORM_FILTER_STRICT_MANIFEST,
+    )
+
+
+def select_files(zip_path: str, node_id: str) -> ScormFilterResult:
+    """
+    Validate a downloaded package and select the files to upload.
+
+    Raises
+    ------
+    ScormValidationError
+        The ZIP is not a valid SCORM package.
+    """
+    with stage("validate"):
+        result = ScormZipDetector().detect(zip_path)
+    if not result.is_scorm or not result.is_valid:
+        raise ScormValidationError(result.errors)
+
+    with stage("filter"):
+        selection = build_file_filter().apply(zip_path)
+
+    logger.info(
+        "Filtered package files",
+        extra={
+            "node_id": node_id,
+            "kept_files": len(selection.kept),
+            "kept_bytes": selection.kept_bytes,
+            "dropped_files": selection.dropped_files,
+            "dropped_bytes": selection.dropped_bytes,
+        },
+    )
+
+    return selection
@@ -0,0 +1,74 @@
+"""
+workers.pool_tuning
+===================
+
+Live resizing of the worker pool from the ``WORKER_CONCURRENCY``
+tunable (see ``core.tunables``).
+
+When the worker is ready, its main process starts watching the
+tunables. On a change it asks itself to grow or shrink the pool
+through the ``pool_grow`` / ``pool_shrink`` remote-control commands.
+Celery runs these commands inside the worker's own event loop, and
+they also update the broker prefetch. Removing the override restores
+the size the worker was started with.
+
+Only pools that support resizing (prefork) are resized. With other
+pools the change is logged and ignored. In async execution mode, use
+the ``ASYNC_MAX_IN_FLIGHT_REQUESTS`` tunable instead.
+"""
+
+import logging
+
+from celery.signals import worker_ready
+
+from core import tunables
+
+logger = logging.getLogger(__name__)
+
+
+@worker_ready.connect
+def _on_worker_ready(sender, **kwargs) -> None:
+    """
+    Start resizing the pool of this worker on tunable changes.
+
+    Parameters
+    ----------
+    sender : celery.worker.consumer.Consumer
+        Consumer of the worker that became ready.
+    """
+    consumer = sender
+    started_size = consumer.controller.concurrency
+    state = {"size": started_size}
+
+    def _resize(old, new) -> None:
+        target = new.WORKER_CONCURRENCY or started_size
+        delta = target - state["size"]
+        if not delta:
+            return
+
+        if not hasattr(consumer.pool, "grow"):
+            logger.warning(
+                "Worker pool cannot be resized live",
+                extra={"pool": type(consumer.pool).__name__, "target": target},
+            )
+            return
+
+        control = consumer.app.control
+        if delta > 0:
+            control.pool_grow(delta, destination=[consumer.hostname])
+        else:
+            control.pool_shrink(-delta, destination=[consumer.hostname])
+
+        logger.warning(
+            "Worker pool resize requested",
+            extra={"from": state["size"], "to": target},
+        )
+        state["size"] = target
+
+    tunables.on_change(_resize)
+    tunables.watch()
+
+    # Override already in force at startup
+    current = tunables.get()
+    if current.WORKER_CONCURRENCY and current.WORKER_CONCURRENCY != started_size:
+        _resize(current, current)
@@ -0,0 +1,216 @@
+"""
+workers.profiling
+=================
+
+Opt-in profiling of individual task runs.
+
+A run of ``process_scorm_zip`` is profiled when any trigger fires:
+- ``PROFILE_ENABLED`` is set (profile everything)
+- the event's ``size`` is at least ``PROFILE_MIN_SIZE_BYTES``
+- a random draw falls under ``PROFILE_SAMPLE_RATE``
+
+Upload shards of a staged package are profiled when the run that
+staged it was: the decision and the event's node and size are kept
+in the stage plan.
+
+A profiled run is wrapped with ``cProfile`` and ``tracemalloc``. Each
+pipeline stage records its wall time, peak traced memory and top
+allocation sites. Files are written to ``PROFILE_DIR``::
+
+    <node_id>_<task_id>.prof          cProfile stats (pstats / snakeviz)
+    <node_id>_<task_id>.memory.json   per-stage time & peak memory summary
+
+When no run is being profiled, ``profile_stage`` costs one context
+variable lookup.
+
+NOTE:
+tracemalloc is process-wide; under a thread pool, concurrent tasks in
+the same process are included in each other's memory figures.
+"""
+
+import contextvars
+import cProfile
+import json
+import logging
+import os
+import random
+import re
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+from core.settings import settings
+
+logger = logging.getLogger(__name__)
+
+_TOP_ALLOCATIONS = 10
+
+
+class TaskProfile:
+    """
+    CPU and memory profile of one task run.
+
+    Parameters
+    ----------
+    node_id : str
+        Node being processed (used in file names).
+    task_id : str
+        Celery task id (used in file names).
+    """
+
+    def __init__(self, node_id: str, task_id: str):
+        self.node_id = node_id
+        self.task_id = task_id
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self._profiler = cProfile.Profile()
+        self._owns_tracemalloc = False
+        self._started = 0.0
+
+    @property
+    def basename(self) -> str:
+        safe = re.sub(r"[^A-Za-z0-9_.-]", "_", f"{self.node_id}_{self.task_id}")
+        return os.path.join(settings.PROFILE_DIR, safe)
+
+    def start(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._owns_tracemalloc = True
+        self._started = time.perf_counter()
+        self._profiler.enable()
+
+    def stop(self) -> None:
+        self._profiler.disable()
+        _, peak = tracemalloc.get_traced_memory()
+
+        summary = {
+            "node_id": self.node_id,
+            "task_id": self.task_id,
+            "seconds": round(time.perf_counter() - self._started, 3),
+            "peak_bytes": max(
+                [peak] + [s["peak_bytes"] for s in self.stages.values()]
+            ),
+            "stages": self.stages,
+        }
+
+        if self._owns_tracemalloc:
+            tracemalloc.stop()
+
+        os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+        self._profiler.dump_stats(f"{self.basename}.prof")
+        with open(f"{self.basename}.memory.json", "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+
+        logger.info(
+            "Task profile written",
+            extra={
+                "path": self.basename,
+                "seconds": summary["seconds"],
+                "peak_bytes": summary["peak_bytes"],
+            },
+        )
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        tracemalloc.reset_peak()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            top = tracemalloc.take_snapshot().statistics("lineno")[:_TOP_ALLOCATIONS]
+
+            self.stages[name] = {
+                "seconds": round(time.perf_counter() - started, 3),
+                "peak_bytes": peak,
+                "retained_bytes": current,
+                "top_allocations": [
+                    {"site": str(stat.traceback), "bytes": stat.size}
+                    for stat in top
+                ],
+            }
+
+
+_active: contextvars.ContextVar[Optional[TaskProfile]] = contextvars.ContextVar(
+    "active_profile", default=None
+)
+
+
+def should_profile(payload: dict) -> bool:
+    """
+    Decide whether a run for the given event payload is profiled.
+    """
+    if not settings.PROFILE_DIR:
+        return False
+
+    if settings.PROFILE_ENABLED:
+        return True
+
+    size = payload.get("size")
+    if settings.PROFILE_MIN_SIZE_BYTES and size and size >= settings.PROFILE_MIN_SIZE_BYTES:
+        return True
+
+    return random.random() < settings.PROFILE_SAMPLE_RATE
+
+
+def active_profile() -> Optional[TaskProfile]:
+    """
+    Profile of the current run, None when it is not profiled.
+    """
+    return _active.get()
+
+
+@contextmanager
+def maybe_profile(
+    payload: dict, task_id: str, force: Optional[bool] = None
+) -> Iterator[Optional[TaskProfile]]:
+    """
+    Profile the enclosed task run if a trigger fires.
+
+    Parameters
+    ----------
+    payload : dict
+        RepoEvent payload of the run.
+    task_id : str
+        Celery task id.
+    force : bool, optional
+        Decision already taken (e.g. by the run that staged a package);
+        the triggers are only evaluated when None.
+    """
+    if force is None:
+        profiled = should_profile(payload)
+    else:
+        profiled = force and bool(settings.PROFILE_DIR)
+
+    if not profiled:
+        yield None
+        return
+
+    node_id = str(payload.get("nodeRef") or "unknown").split("/")[-1]
+    profile = TaskProfile(node_id, task_id)
+
+    token = _active.set(profile)
+    profile.start()
+    try:
+        yield profile
+    finally:
+        _active.reset(token)
+        try:
+            profile.stop()
+        except Exception:
+            logger.exception("Failed to write task profile")
+
+
+@contextmanager
+def profile_stage(name: str) -> Iterator[None]:
+    """
+    Attribute time and peak memory of the enclosed block to a stage
+    of the active profile (no-op when the run is not profiled).
+    """
+    profile = _active.get()
+    if profile is None:
+        yield
+        return
+
+    with profile.stage(name):
+        yield
@@ -0,0 +1,111 @@
+"""
+workers.staging
+===============
+
+Shared staging area for fan-out (staged) package processing.
+
+Large packages are split across many workers. The task that prepares
+a package stores the ZIP and an upload plan in a directory under
+``SCORM_STAGING_DIR``; upload-shard tasks on any worker read both
+from there. The directory must therefore be a volume shared by all
+worker hosts.
+
+Layout::
+
+    <SCORM_STAGING_DIR>/<stage_id>/
+        package.zip
+        plan.json
+        done-<shard>.txt    members already uploaded by a shard
+"""
+
+import json
+import os
+import shutil
+import uuid
+from typing import Any, Dict, Set
+
+from core.settings import settings
+
+ZIP_NAME = "package.zip"
+PLAN_NAME = "plan.json"
+
+
+def staging_enabled() -> bool:
+    """
+    Whether a shared staging directory is configured.
+    """
+    return bool(settings.SCORM_STAGING_DIR)
+
+
+def create_stage() -> str:
+    """
+    Create a new, empty stage directory.
+
+    Returns
+    -------
+    str
+        Stage identifier.
+    """
+    stage_id = uuid.uuid4().hex
+    os.makedirs(stage_path(stage_id))
+    return stage_id
+
+
+def stage_path(stage_id: str, *parts: str) -> str:
+    """
+    Resolve a path inside a stage directory.
+    """
+    return os.path.join(settings.SCORM_STAGING_DIR, stage_id, *parts)
+
+
+def write_plan(stage_id: str, plan: Dict[str, Any]) -> None:
+    """
+    Publish the upload plan of a stage atomically.
+    """
+    target = stage_path(stage_id, PLAN_NAME)
+    tmp = f"{target}.tmp"
+
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(plan, f)
+
+    os.replace(tmp, target)
+
+
+def read_plan(stage_id: str) -> Dict[str, Any]:
+    """
+    Load the upload plan of a stage.
+    """
+    with open(stage_path(stage_id, PLAN_NAME), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def uploaded_members(stage_id: str, shard_index: int) -> Set[str]:
+    """
+    Members of a shard recorded as uploaded by earlier attempts.
+    """
+    try:
+        with open(_progress_path(stage_id, shard_index), encoding="utf-8") as f:
+            return set(f.read().splitlines())
+    except FileNotFoundError:
+        return set()
+
+
+def mark_uploaded(stage_id: str, shard_index: int, member: str) -> None:
+    """
+    Record a shard member as uploaded, so a retry of the shard skips it.
+    """
+    with open(_progress_path(stage_id, shard_index), "a", encoding="utf-8") as f:
+        f.write(member + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _progress_path(stage_id: str, shard_index: int) -> str:
+    return stage_path(stage_id, f"done-{shard_index}.txt")
+
+
+def remove_stage(stage_id: str) -> None:
+    """
+    Delete a stage directory and everything in it.
+    """
+    shutil.rmtree(stage_path(stage_id), ignore_errors=True)
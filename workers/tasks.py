@@ -1,16 +1,45 @@
+import logging
 import os
+import shutil
 import tempfile
+import time
+import zipfile
+from contextlib import contextmanager
+from typing import Optional
 import requests
-from celery import shared_task
+from celery import Signature, chord, shared_task
 
-from core.schema import RepoEvent
+from core.failures import BYPASS_NEGATIVE_CACHE, rejection
+from core.schema import RepoEvent, is_zip_content
 from core.settings import settings
+from core.task_names import PROCESS_SCORM_ZIP
+from core.tracing import ENQUEUED_AT, TRACEPARENT, extract, inject, start_span
 
-from services.alfresco_client import AlfrescoClient
-from services.scorm_zip_detector import ScormZipDetector
 from services.scorm_extractor import ScormExtractor
 from services.scorm_uploader import ScormUploader
-from services.exceptions import ScormValidationError
+from services.exceptions import (
+    AlfrescoRequestError,
+    InvalidEventError,
+    ScormValidationError,
+    is_permanent,
+)
+from workers.alfresco import build_alfresco_client, build_content_source, build_contentstore
+from workers.negative_cache import cache_key, get_rejection, remember_rejection
+from workers.pipeline import select_files, stage
+from workers.profiling import active_profile, maybe_profile
+from workers.staging import (
+    ZIP_NAME,
+    create_stage,
+    mark_uploaded,
+    read_plan,
+    remove_stage,
+    stage_path,
+    staging_enabled,
+    uploaded_members,
+    write_plan,
+)
+
+logger = logging.getLogger(__name__)
 
 
 def _extract_node_id(node_ref: str) -> str:
@@ -18,13 +47,43 @@ def _extract_node_id(node_ref: str) -> str:
     workspace://SpacesStore/<uuid> → <uuid>
     """
     if not node_ref or "/" not in node_ref:
-        raise ValueError(f"Invalid nodeRef: {node_ref}")
+        raise InvalidEventError(f"Invalid nodeRef: {node_ref}")
     return node_ref.split("/")[-1]
 
 
+def _is_large_package(file_count: int, total_bytes: int) -> bool:
+    """
+    Whether a package crosses the fan-out thresholds.
+    """
+    return (
+        file_count >= settings.SCORM_FANOUT_MIN_FILES
+        or total_bytes >= settings.SCORM_FANOUT_MIN_BYTES
+    )
+
+
+@contextmanager
+def _task_span(task, name: str):
+    """
+    Trace a task run as a child of the publisher's span, recording how
+    long the message waited in the Celery queue.
+    """
+    parent = extract(task.request.get(TRACEPARENT))
+
+    with start_span(
+        name,
+        {"celery.task_id": task.request.id, "celery.retries": task.request.retries},
+        parent=parent,
+    ) as span:
+        enqueued_at = task.request.get(ENQUEUED_AT)
+        if enqueued_at:
+            span.set_attribute("queue.wait_seconds", time.time() - float(enqueued_at))
+        yield span
+
+
 @shared_task(
+    name=PROCESS_SCORM_ZIP,
     bind=True,
-    autoretry_for=(requests.HTTPError, RuntimeError),
+    autoretry_for=(requests.HTTPError, AlfrescoRequestError, RuntimeError),
     retry_kwargs={"max_retries": 5, "countdown": 15},
 )
 def process_scorm_zip(self, payload: dict) -> bool:
@@ -35,47 +94,111 @@ def process_scorm_zip(self, payload: dict) -> bool:
     - Validate payload schema
     - Download ZIP from Alfresco
     - Validate SCORM (imsmanifest.xml sanity)
+    - Filter junk / unreferenced files
     - Create folder (same parent, ZIP name)
     - Extract safely
     - Upload extracted content
+
+    Packages above the fan-out thresholds are staged instead: this
+    task builds the folder skeleton and replaces itself with a chord
+    of upload-shard tasks, whose callback result becomes this task's
+    result.
+
+    With ``WORKER_EXECUTION_MODE=async`` the pipeline runs on the
+    process event loop instead (see ``workers.async_pipeline``).
+
+    Permanent failures are not raised: they are cached per node
+    version and returned as a rejection (see ``core.failures``), so the
+    listener can dead-letter the message instead of redelivering it.
+    Replays (``bypass_negative_cache`` header) skip the cache lookup.
+    """
+    negative_key = cache_key(payload)
+
+    cached = None if self.request.get(BYPASS_NEGATIVE_CACHE) else get_rejection(negative_key)
+    if cached is not None:
+        logger.info("Rejected from negative cache", extra={"key": negative_key})
+        return cached
+
+    try:
+        with _task_span(self, "process_scorm_zip") as span, maybe_profile(payload, self.request.id):
+            outcome = _process_scorm_zip(payload, span)
+    except Exception as exc:
+        if not is_permanent(exc):
+            raise
+        return _reject(negative_key, exc)
+
+    if isinstance(outcome, Signature):
+        return self.replace(outcome)
+
+    return outcome
+
+
+def _reject(negative_key: Optional[str], exc: Exception) -> dict:
+    """
+    Turn a permanent failure into a cached rejection result.
     """
+    result = rejection(
+        type(exc).__name__,
+        str(exc),
+        details=exc.errors if isinstance(exc, ScormValidationError) else None,
+    )
+    remember_rejection(negative_key, result)
+
+    logger.warning(
+        "Permanent failure – rejecting",
+        extra={"key": negative_key, "error": type(exc).__name__},
+    )
+    return result
+
 
+def _process_scorm_zip(payload: dict, span):
+    """
+    Task body of ``process_scorm_zip``.
+
+    Returns True when done, or the chord signature of a staged package.
+    """
     event = RepoEvent.model_validate(payload)
 
     if event.eventType != "BINARY_CHANGED":
         return True
 
-    if not event.name or not event.name.lower().endswith(".zip"):
-        return True
-
-    if event.mimeType and event.mimeType != "application/zip":
+    if not is_zip_content(event.name, event.mimeType):
         return True
 
     if not event.nodeRef or not event.parentNodeRef:
-        raise RuntimeError("Missing nodeRef or parentNodeRef")
+        raise InvalidEventError("Missing nodeRef or parentNodeRef")
 
     zip_node_id = _extract_node_id(event.nodeRef)
     parent_node_id = _extract_node_id(event.parentNodeRef)
 
+    span.set_attribute("node_id", zip_node_id)
+    span.set_attribute("event.lag_seconds", time.time() - event.event_time())
+
     zip_name = event.name
+
+    if settings.WORKER_EXECUTION_MODE == "async":
+        from workers import async_runtime
+        from workers.async_pipeline import process_package
+
+        return async_runtime.run(
+            process_package(zip_node_id, parent_node_id, zip_name, event.contentUrl)
+        )
+
     target_folder_name = os.path.splitext(zip_name)[0]
 
-    client = AlfrescoClient(
-        settings.ALFRESCO_BASE_URL,
-        settings.ALFRESCO_USERNAME,
-        settings.ALFRESCO_PASSWORD,
-    )
+    client = build_alfresco_client()
+    content_source = build_content_source(client)
 
-    detector = ScormZipDetector()
     extractor = ScormExtractor()
     uploader = ScormUploader(client)
 
     with tempfile.TemporaryDirectory() as tmp:
-        zip_path = os.path.join(tmp, zip_name)
+        scratch_path = os.path.join(tmp, zip_name)
         extract_dir = os.path.join(tmp, "extracted")
 
         try:
-            client.download_content(zip_node_id, zip_path)
+            with stage("download"):
+                zip_path = content_source.fetch(zip_node_id, event.contentUrl, scratch_path)
         except requests.HTTPError as e:
             if e.response is not None and e.response.status_code == 404:
                 raise RuntimeError(
@@ -83,17 +206,201 @@ def process_scorm_zip(self, payload: dict) -> bool:
                 )
             raise
 
-        result = detector.detect(zip_path)
-        if not result.is_scorm or not result.is_valid:
-            raise ScormValidationError(result.errors)
+        # In place: zip_path points into the read-only contentstore
+        in_place = zip_path != scratch_path
+        span.set_attribute("content.in_place", in_place)
+
+        selection = select_files(zip_path, zip_node_id)
+
+        if staging_enabled() and _is_large_package(
+            len(selection.kept), selection.kept_bytes
+        ):
+            profile = (
+                {"nodeRef": event.nodeRef, "size": event.size}
+                if active_profile() is not None
+                else None
+            )
+            with stage("stage"):
+                return _stage_package(
+                    zip_path,
+                    event.contentUrl if in_place else None,
+                    selection.kept,
+                    target_folder_name,
+                    parent_node_id,
+                    extractor,
+                    uploader,
+                    profile,
+                )
 
         target_folder_id = client.create_folder(
             name=target_folder_name,
             parent_id=parent_node_id,
         )
 
-        extractor.extract(zip_path, extract_dir)
+        with stage("extract"):
+            extractor.extract(zip_path, extract_dir, members=selection.kept)
 
-        uploader.upload_directory(extract_dir, target_folder_id)
+        with stage("upload", {"files": len(selection.kept)}):
+            uploader.upload_directory(extract_dir, target_folder_id)
 
     return True
+
+
+def _stage_package(zip_path, content_url, members, target_folder_name, parent_node_id, extractor, uploader, profile=None):
+    """
+    Prepare a large package for fan-out and build its chord.
+
+    The ZIP is moved into shared staging (unless it is read in place
+    from the contentstore, given by ``content_url``), the complete
+    folder skeleton is created in Alfresco, and the member list is
+    published as shards. ``profile`` (nodeRef and size of a profiled
+    run) makes the shards profiled too.
+    """
+    rel_paths = [extractor.safe_path(name) for name in members]
+
+    stage_id = create_stage()
+
+    try:
+        if content_url is None:
+            shutil.move(zip_path, stage_path(stage_id, ZIP_NAME))
+
+        target_folder_id = uploader.client.create_folder(
+            name=target_folder_name,
+            parent_id=parent_node_id,
+        )
+
+        folder_map = uploader.create_folder_tree(
+            (os.path.dirname(p) for p in rel_paths),
+            target_folder_id,
+        )
+
+        size = settings.SCORM_FANOUT_SHARD_SIZE
+        shards = [members[i:i + size] for i in range(0, len(members), size)]
+
+        write_plan(
+            stage_id,
+            {
+                "content_url": content_url,
+                "folders": folder_map,
+                "shards": shards,
+                "profile": profile,
+            },
+        )
+    except Exception:
+        remove_stage(stage_id)
+        raise
+
+    logger.info(
+        "Fanning out package upload",
+        extra={
+            "stage_id": stage_id,
+            "files": len(members),
+            "folders": len(folder_map) - 1,
+            "shards": len(shards),
+        },
+    )
+
+    headers = inject()
+
+    return chord(
+        [
+            upload_scorm_shard.si(stage_id, i).set(headers=headers)
+            for i in range(len(shards))
+        ],
+        finalize_scorm_zip.s(stage_id)
+        .set(headers=headers)
+        .on_error(cleanup_scorm_stage.si(stage_id)),
+    )
+
+
+@shared_task(
+    bind=True,
+    # Any network failure: a failed shard fails the chord and the stage
+    autoretry_for=(requests.RequestException, AlfrescoRequestError),
+    retry_kwargs={"max_retries": 5, "countdown": 15},
+)
+def upload_scorm_shard(self, stage_id: str, shard_index: int) -> int:
+    """
+    Upload one slice of a staged package into its folder skeleton,
+    streaming members straight out of the staged ZIP.
+
+    Each uploaded member is recorded in the stage, so a retry only
+    uploads what the failed attempt did not (the rest would be uploaded
+    again as new versions).
+
+    Returns the number of files in the shard.
+    """
+    plan = read_plan(stage_id)
+    members = plan["shards"][shard_index]
+    done = uploaded_members(stage_id, shard_index)
+
+    extractor = ScormExtractor()
+    uploader = ScormUploader(build_alfresco_client())
+
+    profile = plan.get("profile")
+
+    with _task_span(self, "upload_scorm_shard") as span, maybe_profile(
+        profile or {}, self.request.id, force=profile is not None
+    ):
+        span.set_attribute("stage_id", stage_id)
+        span.set_attribute("files", len(members))
+        span.set_attribute("files_already_uploaded", len(done))
+
+        with stage("upload"), zipfile.ZipFile(_staged_zip(stage_id, plan)) as zf:
+            uploader.upload_zip_members(
+                zf,
+                {
+                    name: extractor.safe_path(name)
+                    for name in members
+                    if name not in done
+                },
+                plan["folders"],
+                on_uploaded=lambda name: mark_uploaded(stage_id, shard_index, name),
+            )
+
+    return len(members)
+
+
+def _staged_zip(stage_id: str, plan: dict) -> str:
+    """
+    Path of a staged package's ZIP on this worker: the staged copy, or
+    the contentstore file when the package was staged in place.
+    """
+    content_url = plan.get("content_url")
+    if not content_url:
+        return stage_path(stage_id, ZIP_NAME)
+
+    contentstore = build_contentstore()
+    path = contentstore.resolve(content_url) if contentstore else None
+    if path is None:
+        raise RuntimeError(f"Staged content not readable on this worker: {content_url}")
+
+    return path
+
+
+@shared_task(bind=True)
+def finalize_scorm_zip(self, shard_counts, stage_id: str) -> bool:
+    """
+    Chord callback: all shards uploaded, release the stage.
+
+    Its result is delivered to whoever waits on the original
+    ``process_scorm_zip`` task (the listener).
+    """
+    with _task_span(self, "finalize_scorm_zip"):
+        remove_stage(stage_id)
+
+    logger.info(
+        "Staged package uploaded",
+        extra={"stage_id": stage_id, "files": sum(shard_counts)},
+    )
+
+    return True
+
+
+@shared_task
+def cleanup_scorm_stage(stage_id: str) -> None:
+    """
+    Chord error callback: release the stage of a failed package.
+    """
+    logger.warning("Staged package failed", extra={"stage_id": stage_id})
+    remove_stage(stage_id)